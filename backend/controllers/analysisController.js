@@ -4,6 +4,7 @@ import path from 'path';
 import { fileURLToPath } from 'url';
 import Product from '../models/Product.js';
 import { v4 as uuidv4 } from 'uuid';
+import axios from 'axios';
 
 // Fix __dirname for ES modules
 const __filename = fileURLToPath(import.meta.url);
@@ -43,6 +44,23 @@ class AnalysisController {
     });
   }
 
+  // Helper function to call the long-running Python analysis service
+  async runAnalysisService(url) {
+    const serviceUrl = process.env.ANALYSIS_SERVICE_URL;
+    console.log(`Calling analysis service: ${serviceUrl}/analyze`);
+
+    try {
+      const response = await axios.post(`${serviceUrl}/analyze`, { url }, { timeout: 5 * 60 * 1000 });
+      return response.data;
+    } catch (error) {
+      // Non-2xx responses still carry a JSON error body
+      if (error.response?.data) {
+        return error.response.data;
+      }
+      throw error;
+    }
+  }
+
   // Main analysis function
   async analyzeProduct(req, res) {
     try {
@@ -110,32 +128,53 @@ class AnalysisController {
         }
       );
 
-      // Step 1: Scrape product data
-      console.log('🔦 Step 1: Scraping product data...');
-      const scrapedData = await this.runPythonScript('scraper.py', [url]);
-      
-      if (!scrapedData || !scrapedData.success) {
-        throw new Error(`Scraping failed: ${scrapedData?.error || 'Unknown error'}`);
-      }
+      let scrapedData;
+      let sentimentData;
 
-      console.log(`✅ Scraped ${scrapedData.reviews?.length || 0} reviews`);
+      if (process.env.ANALYSIS_SERVICE_URL) {
+        // Scrape + sentiment in one call; the service reuses its model and coalesces duplicate URLs
+        console.log('🔦 Step 1-2: Requesting analysis from service...');
+        const serviceData = await this.runAnalysisService(url);
 
-      // Update status
-      await Product.findOneAndUpdate(
-        { analysis_id: analysisId },
-        { 
-          'scrape_info.notes': 'Analyzing sentiment...'
+        if (!serviceData || !serviceData.success) {
+          throw new Error(`Scraping failed: ${serviceData?.error || 'Unknown error'}`);
         }
-      );
 
-      // Step 2: Analyze sentiment
-      console.log('🧠 Step 2: Analyzing sentiment...');
-      const sentimentData = await this.runPythonScript(
-        'sentiment_analyzer.py', 
-        [JSON.stringify(scrapedData.reviews)]
-      );
+        scrapedData = {
+          success: true,
+          product: serviceData.product,
+          reviews: serviceData.reviews
+        };
+        sentimentData = serviceData.analysis;
+        console.log(`✅ Analysis service returned ${scrapedData.reviews?.length || 0} reviews (${serviceData.served_from})`);
+      } else {
+        // Step 1: Scrape product data
+        console.log('🔦 Step 1: Scraping product data...');
+        scrapedData = await this.runPythonScript('scraper.py', [url]);
+        
+        if (!scrapedData || !scrapedData.success) {
+          throw new Error(`Scraping failed: ${scrapedData?.error || 'Unknown error'}`);
+        }
 
-      console.log('✅ Sentiment analysis complete');
+        console.log(`✅ Scraped ${scrapedData.reviews?.length || 0} reviews`);
+
+        // Update status
+        await Product.findOneAndUpdate(
+          { analysis_id: analysisId },
+          { 
+            'scrape_info.notes': 'Analyzing sentiment...'
+          }
+        );
+
+        // Step 2: Analyze sentiment
+        console.log('🧠 Step 2: Analyzing sentiment...');
+        sentimentData = await this.runPythonScript(
+          'sentiment_analyzer.py', 
+          [JSON.stringify(scrapedData.reviews)]
+        );
+
+        console.log('✅ Sentiment analysis complete');
+      }
 
       // Step 3: Process and structure data
       console.log('📊 Step 3: Processing data...');
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Long-running local HTTP service for scraping + sentiment analysis.
+
+Keeps the sentiment model loaded between requests, coalesces concurrent
+requests for the same product into one job and caches recent results.
+
+Endpoints:
+    POST /analyze   {"url": "..."}  -> {"success": true, "product", "reviews", "analysis", ...}
+    GET  /history?url=...&start=&end=&step=  -> price/rating/sentiment snapshots
+    GET  /metrics                   -> queue, cache and per-stage latency histograms
+    GET  /health
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from scraper import ProductReviewScraper, normalize_product_url
+from sentiment_analyzer import SentimentAnalyzer
+from snapshot_store import SnapshotStore, snapshot_from_analysis
+
+
+class ServiceBusy(Exception):
+    """Raised when the job queue is full"""
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds"""
+
+    BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        ms = seconds * 1000
+        with self.lock:
+            self.counts[bisect_left(self.BUCKETS_MS, ms)] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q):
+        """Upper bucket bound containing the q-th quantile"""
+        if not self.count:
+            return 0
+        target = q * self.count
+        running = 0
+        for idx, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                return self.BUCKETS_MS[idx] if idx < len(self.BUCKETS_MS) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def snapshot(self):
+        with self.lock:
+            buckets = {f'le_{bound}': count for bound, count in zip(self.BUCKETS_MS, self.counts)}
+            buckets['le_inf'] = self.counts[-1]
+            return {
+                'count': self.count,
+                'mean_ms': round(self.total_ms / self.count, 1) if self.count else 0,
+                'max_ms': round(self.max_ms, 1),
+                'p50_ms': self.quantile(0.5),
+                'p95_ms': self.quantile(0.95),
+                'buckets': buckets
+            }
+
+
+class AnalysisService:
+    STAGES = ['queue', 'scrape', 'analyze', 'total']
+
+    def __init__(self, max_workers=2, max_queue=32, cache_ttl=600, cache_size=256,
+                 use_browser=True, site=None, aspect_mode=False, snapshot_dir=None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.use_browser = use_browser
+        self.site = site
+
+        # One model for the lifetime of the service
+        self.analyzer = SentimentAnalyzer(aspect_mode=aspect_mode)
+        self.analyzer_lock = threading.Lock()
+        self.snapshots = SnapshotStore(snapshot_dir) if snapshot_dir else None
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.cache = OrderedDict()
+        self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+        self.counters = {'requests': 0, 'jobs': 0, 'coalesced': 0, 'cache_hits': 0, 'rejected': 0, 'failures': 0}
+
+    def get_cached(self, key):
+        """Cached result for ``key`` if still fresh (caller holds the lock)"""
+        entry = self.cache.get(key)
+        if not entry:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        return result
+
+    def store_cached(self, key, result):
+        """Cache ``result`` for ``key`` (caller holds the lock)"""
+        self.cache[key] = (time.monotonic() + self.cache_ttl, result)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def submit(self, url):
+        """Future for the analysis of ``url``, joining an in-flight job if there is one"""
+        key = normalize_product_url(url)
+
+        with self.lock:
+            self.counters['requests'] += 1
+
+            cached = self.get_cached(key)
+            if cached is not None:
+                self.counters['cache_hits'] += 1
+                return cached, 'cache'
+
+            future = self.inflight.get(key)
+            if future is not None:
+                self.counters['coalesced'] += 1
+                return future, 'coalesced'
+
+            if len(self.inflight) >= self.max_workers + self.max_queue:
+                self.counters['rejected'] += 1
+                raise ServiceBusy(f"Analysis queue is full ({len(self.inflight)} jobs)")
+
+            self.counters['jobs'] += 1
+            future = self.executor.submit(self.run_job, key, time.perf_counter())
+            self.inflight[key] = future
+
+        future.add_done_callback(lambda done, key=key: self.finish_job(key, done))
+        return future, 'job'
+
+    def finish_job(self, key, future):
+        result = future.result() if future.exception() is None else None
+
+        # Cache and leave the in-flight table in one step, so a request arriving
+        # in between always finds one of the two and never starts a second job
+        with self.lock:
+            if result and result.get('success'):
+                self.store_cached(key, result)
+            else:
+                self.counters['failures'] += 1
+            self.inflight.pop(key, None)
+
+    def analyze(self, url, timeout=None):
+        """Analyze ``url`` and wait for the result"""
+        result, source = self.submit(url)
+        if source != 'cache':
+            result = result.result(timeout=timeout)
+        return {**result, 'served_from': source}
+
+    def run_job(self, url, enqueued_at):
+        started = time.perf_counter()
+        self.histograms['queue'].observe(started - enqueued_at)
+
+        scraper = ProductReviewScraper(use_browser=self.use_browser, site=self.site)
+        scraped = scraper.scrape(url)
+        scraped_at = time.perf_counter()
+        self.histograms['scrape'].observe(scraped_at - started)
+
+        if not scraped.get('success'):
+            self.histograms['total'].observe(scraped_at - enqueued_at)
+            return scraped
+
+        with self.analyzer_lock:
+            analysis = self.analyzer.analyze_reviews(scraped.get('reviews', []))
+        finished = time.perf_counter()
+        self.histograms['analyze'].observe(finished - scraped_at)
+        self.histograms['total'].observe(finished - enqueued_at)
+
+        if self.snapshots:
+            try:
+                self.snapshots.append(url, snapshot_from_analysis(scraped.get('product', {}), analysis))
+            except Exception as e:
+                print(f"Could not record snapshot for {url}: {e}", file=sys.stderr)
+
+        return {
+            'success': True,
+            'url': url,
+            'product': scraped.get('product', {}),
+            'reviews': scraped.get('reviews', []),
+            'analysis': analysis,
+            'timings': {
+                'queue_seconds': round(started - enqueued_at, 3),
+                'scrape_seconds': round(scraped_at - started, 3),
+                'analyze_seconds': round(finished - scraped_at, 3)
+            }
+        }
+
+    def history(self, url, start=None, end=None, step=None):
+        """Stored snapshots for ``url``, downsampled when ``step`` is given"""
+        if not self.snapshots:
+            raise ValueError("Snapshot store is not enabled (start with --snapshot-dir)")
+        key = normalize_product_url(url)
+        if step:
+            end = end if end is not None else int(time.time())
+            start = start if start is not None else end - 30 * 24 * 3600
+            return self.snapshots.downsample(key, start, end, step)
+        return self.snapshots.read_range(key, start, end)
+
+    def metrics(self):
+        with self.lock:
+            counters = dict(self.counters)
+            inflight = len(self.inflight)
+            cached = len(self.cache)
+        return {
+            'counters': counters,
+            'queue': {
+                'inflight': inflight,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue
+            },
+            'cache': {'entries': cached, 'ttl_seconds': self.cache_ttl},
+            'latency': {stage: histogram.snapshot() for stage, histogram in self.histograms.items()}
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+def make_handler(service, request_timeout):
+    class AnalysisRequestHandler(BaseHTTPRequestHandler):
+        def send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == '/health':
+                self.send_json(200, {'success': True, 'status': 'ok'})
+            elif parsed.path == '/metrics':
+                self.send_json(200, service.metrics())
+            elif parsed.path == '/history':
+                self.send_history(parse_qs(parsed.query))
+            else:
+                self.send_json(404, {'success': False, 'error': 'Route not found'})
+
+        def send_history(self, query):
+            url = query.get('url', [None])[0]
+            if not url:
+                self.send_json(400, {'success': False, 'error': 'Product URL is required'})
+                return
+
+            try:
+                start, end, step = (int(query[name][0]) if name in query else None for name in ['start', 'end', 'step'])
+                history = service.history(url, start, end, step)
+            except ValueError as e:
+                self.send_json(400, {'success': False, 'error': str(e)})
+                return
+
+            self.send_json(200, {'success': True, 'url': normalize_product_url(url), 'history': history})
+
+        def do_POST(self):
+            if self.path != '/analyze':
+                self.send_json(404, {'success': False, 'error': 'Route not found'})
+                return
+
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                url = json.loads(self.rfile.read(length) or b'{}').get('url')
+            except (ValueError, AttributeError):
+                self.send_json(400, {'success': False, 'error': 'Invalid JSON body'})
+                return
+
+            if not url:
+                self.send_json(400, {'success': False, 'error': 'Product URL is required'})
+                return
+
+            try:
+                result = service.analyze(url, timeout=request_timeout)
+                self.send_json(200 if result.get('success') else 502, result)
+            except ServiceBusy as e:
+                self.send_json(503, {'success': False, 'error': str(e)})
+            except FutureTimeoutError:
+                self.send_json(504, {'success': False, 'error': 'Analysis timed out'})
+            except Exception as e:
+                self.send_json(500, {'success': False, 'error': f'Analysis failed: {str(e)}'})
+
+        def log_message(self, format, *args):
+            print(f"{self.address_string()} - {format % args}", file=sys.stderr)
+
+    return AnalysisRequestHandler
+
+
+def create_server(service, host='127.0.0.1', port=8765, request_timeout=300):
+    return ThreadingHTTPServer((host, port), make_handler(service, request_timeout))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Review Radar analysis service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2, help='Concurrent scrape/analysis jobs')
+    parser.add_argument('--max-queue', type=int, default=32, help='Jobs allowed to wait before returning 503')
+    parser.add_argument('--cache-ttl', type=int, default=600, help='Seconds to serve a cached result')
+    parser.add_argument('--request-timeout', type=int, default=300)
+    parser.add_argument('--no-browser', action='store_true', help='Fetch pages over plain HTTP instead of Selenium')
+    parser.add_argument('--site', help="Force the site parser (e.g. 'amazon') regardless of domain")
+    parser.add_argument('--aspects', action='store_true', help='Score attributes per sentence')
+    parser.add_argument('--snapshot-dir', help='Record price/rating/sentiment history in this directory')
+    args = parser.parse_args()
+
+    service = AnalysisService(
+        max_workers=args.workers,
+        max_queue=args.max_queue,
+        cache_ttl=args.cache_ttl,
+        use_browser=not args.no_browser,
+        site=args.site,
+        aspect_mode=args.aspects,
+        snapshot_dir=args.snapshot_dir
+    )
+    server = create_server(service, args.host, args.port, args.request_timeout)
+    print(f"Analysis service listening on http://{args.host}:{args.port}", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
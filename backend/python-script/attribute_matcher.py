@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import json
+
+
+class AttributeMatcher:
+    """Word-boundary matcher for attribute lexicons.
+
+    The lexicon (``{category: [term, ...]}``) is compiled once into a token
+    index, so matching is a single pass over the tokens of a review no matter
+    how many attributes are configured. Terms may be multi-word phrases, and
+    simple inflected variants ("lasts", "lasting", "charged") are generated
+    at compile time so the text never needs to be lemmatized.
+    """
+
+    # Same tokens as the TF-IDF keyword extractor, so "camera's" -> "camera" and "don't" -> "don"
+    TOKEN_PATTERN = re.compile(r'(?u)\b\w\w+\b')
+
+    def __init__(self, lexicon, inflect=True):
+        self.lexicon = {category: list(terms) for category, terms in lexicon.items()}
+        self.inflect = inflect
+        self.index = {}
+        self.prefixes = set()
+        self.compile()
+
+    @classmethod
+    def from_file(cls, path, base_lexicon=None, inflect=True):
+        """Build a matcher from a JSON lexicon file, optionally extending a base lexicon"""
+        lexicon = {category: list(terms) for category, terms in (base_lexicon or {}).items()}
+        for category, terms in cls.load_lexicon(path).items():
+            existing = lexicon.setdefault(category, [])
+            existing.extend(term for term in terms if term not in existing)
+        return cls(lexicon, inflect=inflect)
+
+    @staticmethod
+    def load_lexicon(path):
+        """Load a ``{category: [term, ...]}`` lexicon from a JSON file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            lexicon = json.load(f)
+
+        if not isinstance(lexicon, dict) or not all(isinstance(terms, list) for terms in lexicon.values()):
+            raise ValueError(f"Lexicon file {path} must map categories to lists of terms")
+
+        return {str(category).lower(): [str(term) for term in terms] for category, terms in lexicon.items()}
+
+    def tokenize(self, text):
+        """Lowercased word tokens with their character spans"""
+        return [(m.group(), m.start(), m.end()) for m in self.TOKEN_PATTERN.finditer(text.lower())]
+
+    def word_variants(self, word):
+        """Inflected forms of a single word"""
+        variants = {word}
+        if not self.inflect or len(word) < 3 or not word.isalpha():
+            return variants
+
+        if word.endswith('y') and word[-2] not in 'aeiou':
+            variants.update({word[:-1] + 'ies', word[:-1] + 'ied'})
+        elif word.endswith(('s', 'x', 'z', 'ch', 'sh')):
+            variants.add(word + 'es')
+        else:
+            variants.add(word + 's')
+
+        stem = word[:-1] if word.endswith('e') else word
+        variants.update({stem + 'ed', stem + 'ing'})
+
+        # Short consonant-vowel-consonant words double the final letter ("fit" -> "fitting")
+        if len(word) <= 4 and word[-1] not in 'aeiouwxy' and word[-2] in 'aeiou' and word[-3] not in 'aeiou':
+            variants.update({word + word[-1] + 'ed', word + word[-1] + 'ing'})
+
+        return variants
+
+    def compile(self):
+        """Build the token-sequence index for every term and variant"""
+        for category, terms in self.lexicon.items():
+            for term in terms:
+                words = tuple(token for token, _, _ in self.tokenize(term))
+                if not words:
+                    continue
+
+                # Only the head (last) word of a phrase is inflected
+                for variant in self.word_variants(words[-1]):
+                    key = words[:-1] + (variant,)
+                    self.index.setdefault(key, set()).add(category)
+
+                self.prefixes.update(words[:i] for i in range(1, len(words)))
+
+        # Freeze category sets so matches can hand them out without re-sorting
+        self.index = {key: tuple(sorted(categories)) for key, categories in self.index.items()}
+
+    def match(self, text, longest_only=True):
+        """Find lexicon terms in ``text``.
+
+        Returns a list of ``(start, end, term, categories)`` tuples. With
+        ``longest_only`` matches do not overlap and the longest phrase wins at
+        each position ("cheap quality" beats "cheap"); otherwise every term
+        starting at every token is returned.
+        """
+        tokens = self.tokenize(text)
+        words = [token for token, _, _ in tokens]
+        matches = []
+        position = 0
+
+        while position < len(tokens):
+            found = []
+            key = ()
+            # Extend the phrase only while it is still a prefix of some lexicon term
+            for end in range(position, len(tokens)):
+                key = key + (words[end],)
+                categories = self.index.get(key)
+                if categories:
+                    found.append((tokens[position][1], tokens[end][2], ' '.join(key), list(categories)))
+                if key not in self.prefixes:
+                    break
+
+            if longest_only and found:
+                matches.append(found[-1])
+                position += len(found[-1][2].split())
+            else:
+                matches.extend(found)
+                position += 1
+
+        return matches
+
+    def detect(self, text):
+        """Categories mentioned in ``text``"""
+        detected = set()
+        for _, _, _, categories in self.match(text):
+            detected.update(categories)
+        return sorted(detected)
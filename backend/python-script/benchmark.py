@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Micro-benchmarks for the review analysis pipeline.
+
+Usage: python benchmark.py <benchmark> [options]
+"""
+
+import os
+import re
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from urllib.request import Request, urlopen
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from review_dedup import ReviewDeduplicator
+from attribute_matcher import AttributeMatcher
+from sentiment_analyzer import SentimentAnalyzer
+
+
+BOILERPLATE = ['Good product', 'Nice', 'Value for money', 'Awesome', 'Worth the price']
+
+ASPECTS = [
+    'battery life', 'camera', 'screen', 'build quality', 'delivery', 'price', 'speaker',
+    'charger', 'customer support', 'design', 'performance', 'size', 'packaging', 'display'
+]
+
+POSITIVE_OPINIONS = ['excellent', 'really good', 'impressive', 'great', 'amazing', 'perfect']
+NEGATIVE_OPINIONS = ['terrible', 'poor', 'disappointing', 'awful', 'useless', 'really bad']
+
+CONTEXTS = [
+    'after {n} days of use', 'for daily use', 'compared to my old phone', 'for the money',
+    'in low light', 'while gaming', 'during travel', 'at night', 'out of the box',
+    'after the {n}th charge', 'on a {n} hour trip', 'with heavy apps'
+]
+
+CLOSINGS = ['Would recommend.', 'Returning it.', 'Bought it on sale.', 'Second one I own.', '']
+
+OPINION_PATTERN = re.compile(
+    r'\bis (' + '|'.join(sorted(POSITIVE_OPINIONS + NEGATIVE_OPINIONS, key=len, reverse=True)) + r')\b',
+    re.IGNORECASE
+)
+
+
+def make_review_text(rng):
+    """A distinct review built from aspect/opinion/context templates"""
+    sentences = []
+    for aspect in rng.sample(ASPECTS, rng.randint(1, 3)):
+        opinion = rng.choice(POSITIVE_OPINIONS if rng.random() < 0.6 else NEGATIVE_OPINIONS)
+        context = rng.choice(CONTEXTS).format(n=rng.randint(2, 90))
+        sentences.append(f'The {aspect} is {opinion} {context}.')
+    sentences.append(rng.choice(CLOSINGS))
+    return ' '.join(sentence for sentence in sentences if sentence)
+
+
+def make_near_duplicate(text, rng):
+    """Same review text with the kind of edits real reposts have"""
+    edit = rng.randrange(4)
+    if edit == 0:
+        return text.upper()
+    if edit == 1:
+        return text.rstrip('.') + '!!'
+    if edit == 2:
+        return 'Overall ' + text[0].lower() + text[1:]
+    return text.replace(' ', '  ').replace('.', ' .')
+
+
+def make_hard_negative(text, rng):
+    """A different review: one opinion swapped for its opposite or negated with 'not'"""
+    match = rng.choice(list(OPINION_PATTERN.finditer(text)))
+    opinion = match.group(1).lower()
+    if rng.random() < 0.5:
+        replacement = 'not ' + opinion
+    else:
+        replacement = rng.choice(NEGATIVE_OPINIONS if opinion in POSITIVE_OPINIONS else POSITIVE_OPINIONS)
+    return text[:match.start(1)] + replacement + text[match.end(1):]
+
+
+def make_reviews(count, duplicate_ratio=0.3, hard_negative_ratio=0, seed=7):
+    """Synthetic review corpus.
+
+    Most reviews are distinct. ``duplicate_ratio`` of them are split between
+    the same review scraped twice, lightly edited reposts of an earlier review
+    and short boilerplate from different users. ``hard_negative_ratio`` of them
+    copy an earlier review but change one opinion word or add a 'not', which
+    makes them different reviews. Each review carries a ``group`` id: reviews
+    sharing a group are true duplicates of each other.
+    """
+    rng = random.Random(seed)
+    reviews = []
+    boilerplate_groups = {}
+    used_texts = set()
+
+    for idx in range(count):
+        roll = rng.random()
+        if reviews and roll < duplicate_ratio / 3:
+            # Same review scraped twice (product page + reviews page)
+            reviews.append(dict(rng.choice(reviews)))
+            continue
+
+        if reviews and roll < duplicate_ratio * 2 / 3:
+            original = rng.choice(reviews)
+            text, group = make_near_duplicate(original['text'], rng), original['group']
+        elif roll < duplicate_ratio:
+            text = rng.choice(BOILERPLATE)
+            group = boilerplate_groups.setdefault(text, f'boilerplate_{text}')
+        else:
+            text = None
+            # Derive from original reviews so used_texts catches repeats
+            candidates = [review for review in reviews if review['group'] == review['id']]
+            if candidates and roll < duplicate_ratio + hard_negative_ratio:
+                text, group = make_hard_negative(rng.choice(candidates)['text'], rng), f'hard_negative_{idx}'
+            if text is None or text in used_texts:
+                text, group = make_review_text(rng), f'review_{idx}'
+                while text in used_texts:
+                    text = make_review_text(rng)
+            used_texts.add(text)
+
+        reviews.append({
+            'id': f'review_{idx}',
+            'author': f'User{idx}',
+            'date': '',
+            'stars': rng.randint(1, 5),
+            'text': text,
+            'group': group
+        })
+
+    return reviews
+
+
+def bench_dedup(args):
+    """Measure how much sentiment inference the dedup stage saves, and how often it merges wrongly"""
+    reviews = make_reviews(args.reviews, args.duplicate_ratio, args.hard_negative_ratio)
+    deduplicator = ReviewDeduplicator()
+
+    start = time.perf_counter()
+    unique_reviews, clusters, stats = deduplicator.deduplicate(reviews)
+    elapsed = time.perf_counter() - start
+
+    # A cluster is wrong if it mixes reviews that are not true duplicates
+    wrong_clusters = [cluster for cluster in clusters if len({unique_reviews[idx]['group'] for idx in cluster}) > 1]
+    true_groups = len({review['group'] for review in reviews})
+    hard_negatives = {review['group'] for review in reviews if review['group'].startswith('hard_negative_')}
+
+    return {
+        **stats,
+        'true_duplicate_groups': true_groups,
+        'wrong_clusters': len(wrong_clusters),
+        'wrongly_merged_reviews': sum(len(cluster) for cluster in wrong_clusters),
+        'hard_negatives': len(hard_negatives),
+        'hard_negatives_merged': sum(
+            1 for cluster in wrong_clusters for idx in cluster if unique_reviews[idx]['group'] in hard_negatives
+        ),
+        'largest_cluster': max(len(cluster) for cluster in clusters) if clusters else 0,
+        'dedup_seconds': round(elapsed, 4)
+    }
+
+
+def bench_aspects(args):
+    """Compare full analyze_reviews throughput with and without aspect mode at one batch size"""
+    reviews = make_reviews(args.reviews, duplicate_ratio=0)
+    timings = {}
+    results = {}
+
+    for aspect_mode in (False, True):
+        analyzer = SentimentAnalyzer(aspect_mode=aspect_mode, batch_size=args.batch_size)
+        start = time.perf_counter()
+        results[aspect_mode] = analyzer.analyze_reviews(reviews)
+        timings[aspect_mode] = time.perf_counter() - start
+
+    whole_seconds, aspect_seconds = timings[False], timings[True]
+    return {
+        'reviews': len(reviews),
+        'batch_size': args.batch_size,
+        'whole_review_seconds': round(whole_seconds, 4),
+        'whole_reviews_per_second': round(len(reviews) / whole_seconds, 1) if whole_seconds > 0 else 0,
+        'aspect_seconds': round(aspect_seconds, 4),
+        'aspect_reviews_per_second': round(len(reviews) / aspect_seconds, 1) if aspect_seconds > 0 else 0,
+        'aspect_slowdown': round(aspect_seconds / whole_seconds, 2) if whole_seconds > 0 else 0,
+        **results[True].get('aspect_stats', {})
+    }
+
+
+def make_lexicon(attribute_count, terms_per_attribute=10, seed=11):
+    """Synthetic lexicon; the real attribute vocabulary is mixed into the first attributes"""
+    rng = random.Random(seed)
+    vocabulary = sorted({word for phrase in ASPECTS + POSITIVE_OPINIONS + NEGATIVE_OPINIONS for word in phrase.split()})
+    lexicon = {}
+
+    for idx in range(attribute_count):
+        terms = [f'attr{idx}term{j}' for j in range(terms_per_attribute - 2)]
+        terms.extend(rng.sample(vocabulary, 2))
+        lexicon[f'attribute_{idx}'] = terms
+
+    return lexicon
+
+
+def substring_detect(lexicon, text):
+    """The original per-keyword substring scan, kept as a baseline"""
+    text_lower = text.lower()
+    detected = set()
+    for attribute, keywords in lexicon.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                detected.add(attribute)
+                break
+    return list(detected)
+
+
+def bench_matcher(args):
+    """Compiled attribute matcher vs substring scan for small and large lexicons"""
+    texts = [review['text'] for review in make_reviews(args.reviews, duplicate_ratio=0)]
+    results = {'reviews': len(texts)}
+
+    for attribute_count in args.attributes:
+        lexicon = make_lexicon(attribute_count)
+
+        start = time.perf_counter()
+        matcher = AttributeMatcher(lexicon)
+        compile_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for text in texts:
+            matcher.detect(text)
+        matcher_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for text in texts:
+            substring_detect(lexicon, text)
+        substring_seconds = time.perf_counter() - start
+
+        results[f'{attribute_count}_attributes'] = {
+            'terms': sum(len(terms) for terms in lexicon.values()),
+            'compile_seconds': round(compile_seconds, 4),
+            'matcher_seconds': round(matcher_seconds, 4),
+            'substring_seconds': round(substring_seconds, 4),
+            'matcher_reviews_per_second': round(len(texts) / matcher_seconds, 1) if matcher_seconds > 0 else 0,
+            'speedup': round(substring_seconds / matcher_seconds, 2) if matcher_seconds > 0 else 0
+        }
+
+    return results
+
+
+def bench_memory(args):
+    """Exact vs memory-bounded analysis: Python heap peak, time and keyword overlap"""
+    analyzer = SentimentAnalyzer()
+    results = {'reviews': args.reviews}
+    outputs = {}
+
+    runs = {
+        'exact': lambda: analyzer.analyze_reviews(make_reviews(args.reviews)),
+        'bounded': lambda: analyzer.analyze_reviews_bounded(
+            (review for review in make_reviews(args.reviews)),
+            chunk_size=args.chunk_size,
+            memory_budget_mb=args.memory_budget_mb
+        )
+    }
+
+    for mode, run in runs.items():
+        tracemalloc.start()
+        start = time.perf_counter()
+        outputs[mode] = run()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[mode] = {
+            'seconds': round(elapsed, 3),
+            'heap_peak_mb': round(peak / (1024 * 1024), 1)
+        }
+
+    results['bounded']['memory_stats'] = outputs['bounded']['memory_stats']
+
+    for bucket in ['positive_keywords', 'negative_keywords']:
+        exact_terms = {k['term'] for k in outputs['exact']['keyword_insights'][bucket]}
+        bounded_terms = {k['term'] for k in outputs['bounded']['keyword_insights'][bucket]}
+        results[f'{bucket}_overlap'] = round(len(exact_terms & bounded_terms) / len(exact_terms), 2) if exact_terms else None
+
+    return results
+
+
+def stub_product_page(path, reviews):
+    """Minimal Amazon-like product page for the stub site"""
+    review_html = ''.join(
+        f'<div data-hook="review"><span class="a-profile-name">{review["author"]}</span>'
+        f'<i data-hook="review-star-rating"><span class="a-icon-alt">{review["stars"]}.0 out of 5 stars</span></i>'
+        f'<span data-hook="review-date">Reviewed on 1 January 2026</span>'
+        f'<span data-hook="review-body"><span>{review["text"]} ({path})</span></span></div>'
+        for review in reviews
+    )
+    return (
+        f'<html><body><span id="productTitle">Stub product {path}</span>'
+        f'<a id="bylineInfo">Visit the Stub Store</a>'
+        f'<span class="a-price-whole">1,299</span>'
+        f'<span data-hook="average-star-rating"><span class="a-icon-alt">4.1 out of 5 stars</span></span>'
+        f'<span id="acrCustomerReviewText">{len(reviews)} ratings</span>'
+        f'{review_html}</body></html>'
+    )
+
+
+def start_stub_site(delay, reviews_per_page):
+    """Serve stub product pages on a random local port"""
+    reviews = make_reviews(reviews_per_page, duplicate_ratio=0.2)
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = stub_product_page(self.path, reviews).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_service(args):
+    """Load-test the analysis service against a local stub site"""
+    from analysis_service import AnalysisService, create_server
+
+    stub = start_stub_site(args.stub_delay, args.reviews_per_page)
+    service = AnalysisService(max_workers=args.workers, max_queue=args.requests, use_browser=False, site='amazon')
+    server = create_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    stub_base = f'http://127.0.0.1:{stub.server_address[1]}'
+    service_url = f'http://127.0.0.1:{server.server_address[1]}/analyze'
+
+    def call(idx):
+        body = json.dumps({'url': f'{stub_base}/product/{idx % args.products}'}).encode('utf-8')
+        request = Request(service_url, data=body, headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        with urlopen(request, timeout=600) as response:
+            served_from = json.loads(response.read()).get('served_from')
+        return time.perf_counter() - start, served_from
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        calls = list(pool.map(call, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in calls)
+    metrics = service.metrics()
+    server.shutdown()
+    stub.shutdown()
+    service.shutdown()
+
+    return {
+        'requests': args.requests,
+        'distinct_products': args.products,
+        'concurrency': args.concurrency,
+        'wall_seconds': round(elapsed, 3),
+        'requests_per_second': round(args.requests / elapsed, 1),
+        'client_p50_ms': round(latencies[len(latencies) // 2] * 1000, 1),
+        'client_p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        'counters': metrics['counters'],
+        'latency': {stage: {k: v for k, v in hist.items() if k != 'buckets'} for stage, hist in metrics['latency'].items()}
+    }
+
+
+def bench_snapshots(args):
+    """Snapshot store write throughput (backfill and hourly refresh) and range-query latency"""
+    from snapshot_store import SnapshotStore, RECORD
+
+    rng = random.Random(3)
+    root_dir = args.dir or tempfile.mkdtemp(prefix='snapshots_')
+    store = SnapshotStore(os.path.join(root_dir, 'backfill'))
+    start_ts = 1735689600  # 2025-01-01T00:00:00Z
+    hour = 3600
+
+    def new_product():
+        return {'price': rng.uniform(200, 50000), 'reviews': rng.randint(10, 5000), 'positive': 0}
+
+    def next_snapshot(state, timestamp):
+        if rng.random() < args.change_rate:
+            state['price'] = round(state['price'] * rng.uniform(0.95, 1.05), 2)
+            state['reviews'] += rng.randint(0, 3)
+            state['positive'] = min(state['reviews'], state['positive'] + rng.randint(0, 2))
+        return {
+            'timestamp': timestamp, 'price': state['price'], 'rating': 4.2,
+            'review_count': state['reviews'], 'positive': state['positive'], 'neutral': 0, 'negative': 0
+        }
+
+    # Backfill: one append_many per product covering every hour
+    offered = written = 0
+    write_seconds = 0.0
+    for product in range(args.products):
+        state = new_product()
+        snapshots = [next_snapshot(state, start_ts + h * hour) for h in range(args.hours)]
+
+        start = time.perf_counter()
+        written += store.append_many(f'product-{product}', snapshots)
+        write_seconds += time.perf_counter() - start
+        offered += len(snapshots)
+
+    # Scheduled refresh: every hour, one append per product
+    refresh_store = SnapshotStore(os.path.join(root_dir, 'hourly'))
+    states = [new_product() for _ in range(args.products)]
+    refresh_written = 0
+    refresh_seconds = 0.0
+    for h in range(args.refresh_hours):
+        snapshots = [next_snapshot(state, start_ts + h * hour) for state in states]
+
+        start = time.perf_counter()
+        for product, snapshot in enumerate(snapshots):
+            refresh_written += refresh_store.append(f'product-{product}', snapshot)
+        refresh_seconds += time.perf_counter() - start
+    refresh_offered = args.refresh_hours * args.products
+
+    def timed_queries(query):
+        latencies = []
+        for _ in range(args.queries):
+            product = f'product-{rng.randrange(args.products)}'
+            start = time.perf_counter()
+            query(product)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        return {
+            'p50_ms': round(latencies[len(latencies) // 2], 3),
+            'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 3)
+        }
+
+    end_ts = start_ts + args.hours * hour
+    window = 30 * 24 * hour
+
+    def month_range(product):
+        window_start = rng.randrange(start_ts, max(start_ts + 1, end_ts - window))
+        store.read_range(product, window_start, window_start + window)
+
+    return {
+        'directory': root_dir,
+        'products': args.products,
+        'backfill': {
+            'hours': args.hours,
+            'snapshots_offered': offered,
+            'records_written': written,
+            'bytes_written': written * RECORD.size,
+            'write_seconds': round(write_seconds, 3),
+            'snapshots_per_second': round(offered / write_seconds, 1) if write_seconds > 0 else 0
+        },
+        'hourly_refresh': {
+            'hours': args.refresh_hours,
+            'appends': refresh_offered,
+            'records_written': refresh_written,
+            'write_seconds': round(refresh_seconds, 3),
+            'appends_per_second': round(refresh_offered / refresh_seconds, 1) if refresh_seconds > 0 else 0,
+            'ms_per_refresh': round(refresh_seconds / args.refresh_hours * 1000, 1) if args.refresh_hours else 0
+        },
+        'range_30d': timed_queries(month_range),
+        'downsample_full_daily': timed_queries(lambda product: store.downsample(product, start_ts, end_ts, 24 * hour))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Review Radar analysis benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    dedup_parser = subparsers.add_parser('dedup', help='Inference saved by review dedup')
+    dedup_parser.add_argument('--reviews', type=int, default=1000)
+    dedup_parser.add_argument('--duplicate-ratio', type=float, default=0.3)
+    dedup_parser.add_argument('--hard-negative-ratio', type=float, default=0.1)
+    dedup_parser.set_defaults(func=bench_dedup)
+
+    aspect_parser = subparsers.add_parser('aspects', help='Aspect mode vs whole-review throughput')
+    aspect_parser.add_argument('--reviews', type=int, default=500)
+    aspect_parser.add_argument('--batch-size', type=int, default=32)
+    aspect_parser.set_defaults(func=bench_aspects)
+
+    matcher_parser = subparsers.add_parser('matcher', help='Attribute matcher vs substring scan')
+    matcher_parser.add_argument('--reviews', type=int, default=2000)
+    matcher_parser.add_argument('--attributes', type=int, nargs='+', default=[10, 1000])
+    matcher_parser.set_defaults(func=bench_matcher)
+
+    memory_parser = subparsers.add_parser('memory', help='Exact vs memory-bounded analysis')
+    memory_parser.add_argument('--reviews', type=int, default=20000)
+    memory_parser.add_argument('--chunk-size', type=int, default=1000)
+    memory_parser.add_argument('--memory-budget-mb', type=float, default=256)
+    memory_parser.set_defaults(func=bench_memory)
+
+    service_parser = subparsers.add_parser('service', help='Load-test the analysis service with a stub site')
+    service_parser.add_argument('--requests', type=int, default=200)
+    service_parser.add_argument('--products', type=int, default=10, help='Distinct product URLs')
+    service_parser.add_argument('--concurrency', type=int, default=20)
+    service_parser.add_argument('--workers', type=int, default=2)
+    service_parser.add_argument('--stub-delay', type=float, default=0.5, help='Seconds the stub site takes per page')
+    service_parser.add_argument('--reviews-per-page', type=int, default=15)
+    service_parser.set_defaults(func=bench_service)
+
+    snapshot_parser = subparsers.add_parser('snapshots', help='Snapshot store writes and range queries')
+    snapshot_parser.add_argument('--products', type=int, default=10000)
+    snapshot_parser.add_argument('--hours', type=int, default=24 * 365)
+    snapshot_parser.add_argument('--change-rate', type=float, default=0.05, help='Chance a product changes in a given hour')
+    snapshot_parser.add_argument('--refresh-hours', type=int, default=24, help='Hours of one-append-per-product refreshes to time')
+    snapshot_parser.add_argument('--queries', type=int, default=1000)
+    snapshot_parser.add_argument('--dir', help='Store directory (default: new temp directory)')
+    snapshot_parser.set_defaults(func=bench_snapshots)
+
+    args = parser.parse_args()
+    print(json.dumps(args.func(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Fixed-size building blocks for analyzing very large review sets in chunks."""
+
+import os
+import re
+import sys
+import json
+import math
+import zlib
+import random
+from array import array
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+def iter_json_reviews(path):
+    """Stream reviews from a JSON Lines file (one review object per line), or stdin for '-'"""
+    f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+class MemoryMonitor:
+    """Track process RSS against a soft budget.
+
+    CPython rarely returns memory to the OS, so RSS cannot be pushed back
+    under a budget once it is exceeded. The monitor instead records the RSS
+    at creation (after the model has loaded) as a baseline, and reports
+    pressure only while RSS is over budget *and* still growing, which is when
+    smaller chunks can actually help.
+    """
+
+    GROWTH_TOLERANCE_MB = 1.0
+
+    def __init__(self, budget_mb=None):
+        self.budget_mb = budget_mb
+        self.baseline_mb = self.current_rss_mb()
+        self.last_mb = self.baseline_mb
+        self.peak_mb = self.baseline_mb
+
+    def current_rss_mb(self):
+        """Resident set size of this process in MB"""
+        try:
+            with open('/proc/self/statm', 'r') as f:
+                pages = int(f.read().split()[1])
+            return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+        except (OSError, ValueError, IndexError, AttributeError):
+            return self.max_rss_mb()
+
+    def max_rss_mb(self):
+        """Lifetime peak RSS reported by the OS"""
+        if not RESOURCE_AVAILABLE:
+            return 0
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS reports bytes
+        return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+    def sample(self):
+        """Record current RSS; True if over budget and still growing since the last sample"""
+        rss = self.current_rss_mb()
+        grew = rss - self.last_mb > self.GROWTH_TOLERANCE_MB
+        self.last_mb = rss
+        self.peak_mb = max(self.peak_mb, rss)
+        return bool(self.budget_mb) and rss > self.budget_mb and grew
+
+    def stats(self):
+        return {
+            'budget_mb': self.budget_mb,
+            'baseline_rss_mb': round(self.baseline_mb, 1),
+            'peak_rss_mb': round(self.peak_mb, 1),
+            'growth_mb': round(self.peak_mb - self.baseline_mb, 1),
+            'budget_below_baseline': bool(self.budget_mb) and self.baseline_mb > self.budget_mb,
+            'budget_exceeded': bool(self.budget_mb) and self.peak_mb > self.budget_mb
+        }
+
+
+class ReservoirSample:
+    """Uniform random sample of at most ``size`` items from a stream"""
+
+    def __init__(self, size, seed=None):
+        self.size = size
+        self.seen = 0
+        self.items = []
+        self.rng = random.Random(seed)
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+            return
+        slot = self.rng.randrange(self.seen)
+        if slot < self.size:
+            self.items[slot] = item
+
+
+class HashedKeywordAccumulator:
+    """Streaming TF-IDF style keyword ranking with fixed memory.
+
+    Unigrams and bigrams are hashed into ``n_features`` buckets. Each document
+    contributes its L2-normalized term frequencies and a document-frequency
+    count to its buckets, so memory does not grow with corpus size. One
+    surface form per bucket is kept to turn buckets back into keywords.
+    """
+
+    TOKEN_PATTERN = re.compile(r'\b[a-z][a-z0-9]+\b')
+
+    def __init__(self, stop_words, n_features=2 ** 18, max_df=0.8):
+        self.stop_words = stop_words
+        self.n_features = n_features
+        self.max_df = max_df
+        self.documents = 0
+        self.tf_sums = array('d', bytes(8 * n_features))
+        self.doc_freqs = array('l', [0]) * n_features
+        self.terms = {}
+
+    def bucket(self, term):
+        return zlib.crc32(term.encode('utf-8')) % self.n_features
+
+    def add_document(self, text):
+        words = [w for w in self.TOKEN_PATTERN.findall(text.lower()) if w not in self.stop_words]
+        if not words:
+            return
+
+        counts = {}
+        for term in words + [' '.join(pair) for pair in zip(words, words[1:])]:
+            counts[term] = counts.get(term, 0) + 1
+
+        self.documents += 1
+        norm = math.sqrt(sum(count * count for count in counts.values()))
+        for term, count in counts.items():
+            idx = self.bucket(term)
+            self.tf_sums[idx] += count / norm
+            self.doc_freqs[idx] += 1
+            if idx not in self.terms:
+                self.terms[idx] = term
+
+    def document_count(self, term):
+        """Approximate number of documents containing ``term``"""
+        return self.doc_freqs[self.bucket(term)]
+
+    def top_keywords(self, top_k=15):
+        """Highest scoring keywords, mirroring the exact-mode TF-IDF ranking"""
+        if not self.documents:
+            return []
+
+        scored = []
+        max_docs = self.max_df * self.documents
+        for idx, term in self.terms.items():
+            df = self.doc_freqs[idx]
+            if self.documents > 1 and df > max_docs:
+                continue
+            idf = math.log((1 + self.documents) / (1 + df)) + 1
+            scored.append((self.tf_sums[idx] * idf, term))
+
+        scored.sort(reverse=True)
+        return [term for _, term in scored[:top_k]]
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import random
+import difflib
+import hashlib
+import zlib
+
+
+class ReviewDeduplicator:
+    """Collapse duplicate and near-duplicate reviews before inference.
+
+    Exact duplicates (same named author, date and normalized text, e.g. a
+    review shown on both the product page and the reviews page) are dropped.
+    The remaining reviews are grouped into clusters: identical normalized text
+    first, then near-identical text via MinHash/LSH. A group only joins a
+    cluster if it is similar enough to that cluster's representative and
+    differs from it only in case, punctuation or filler words, so clusters
+    never chain together unrelated reviews or reviews with opposite verdicts.
+    Inference only needs to run on one representative per cluster.
+    """
+
+    MERSENNE_PRIME = (1 << 61) - 1
+    ANONYMOUS_AUTHORS = {'', 'anonymous', 'amazon customer'}
+    FILLER_WORDS = {'overall', 'honestly', 'really', 'very', 'just', 'also', 'truly', 'definitely'}
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.85, long_threshold=0.9,
+                 long_text_words=20, shingle_size=2, seed=42):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.long_threshold = long_threshold
+        self.long_text_words = long_text_words
+        self.shingle_size = shingle_size
+
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randint(1, self.MERSENNE_PRIME - 1), rng.randint(0, self.MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def normalize_text(self, text):
+        """Lowercase, strip punctuation and collapse whitespace"""
+        text = (text or '').lower()
+        text = re.sub(r'[^\w\s]', ' ', text)
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def text_hash(self, normalized_text):
+        """Stable hash of normalized review text"""
+        return hashlib.sha1(normalized_text.encode('utf-8')).hexdigest()
+
+    def review_key(self, review):
+        """Identity of a single scraped review, or None if it cannot be told apart.
+
+        Reviews without a real author (the scraper falls back to 'Anonymous')
+        are never treated as the same review scraped twice.
+        """
+        author = (review.get('author') or '').strip().lower()
+        if author in self.ANONYMOUS_AUTHORS:
+            return None
+        date = (review.get('date') or '').strip().lower()
+        return self.text_hash('\x00'.join([author, date, self.normalize_text(review.get('text', ''))]))
+
+    def remove_exact_duplicates(self, reviews):
+        """Drop reviews that were scraped more than once, keeping first occurrence"""
+        seen = set()
+        unique_reviews = []
+
+        for review in reviews:
+            key = self.review_key(review)
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            unique_reviews.append(review)
+
+        return unique_reviews
+
+    def shingles(self, normalized_text):
+        """Word shingles, falling back to character shingles for very short texts"""
+        words = normalized_text.split()
+        if len(words) >= self.shingle_size:
+            grams = (' '.join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1))
+        else:
+            compact = normalized_text.replace(' ', '_')
+            size = min(4, len(compact)) or 1
+            grams = (compact[i:i + size] for i in range(max(1, len(compact) - size + 1)))
+
+        return {zlib.crc32(gram.encode('utf-8')) for gram in grams}
+
+    def minhash(self, shingle_set):
+        """MinHash signature for a set of hashed shingles"""
+        prime = self.MERSENNE_PRIME
+        if not shingle_set:
+            return (prime,) * self.num_perm
+
+        return tuple(
+            min([(a * value + b) % prime for value in shingle_set])
+            for a, b in self.permutations
+        )
+
+    def similarity_threshold(self, normalized_text):
+        """Long reviews must be closer to count as near-duplicates.
+
+        One changed word ("really good" -> "really bad") barely moves the
+        Jaccard score of a long review, so a stricter threshold applies.
+        """
+        if len(normalized_text.split()) >= self.long_text_words:
+            return self.long_threshold
+        return self.threshold
+
+    def jaccard(self, first, second):
+        """Exact Jaccard similarity of two shingle sets"""
+        if not first and not second:
+            return 1.0
+        return len(first & second) / len(first | second)
+
+    def only_filler_differences(self, first, second):
+        """True if two normalized texts differ only by filler words.
+
+        Normalization already removes case, punctuation and whitespace
+        differences. Any other changed word ("good" -> "bad", "not") can flip
+        the verdict however high the Jaccard score is.
+        """
+        first_words, second_words = first.split(), second.split()
+        matcher = difflib.SequenceMatcher(None, first_words, second_words, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                continue
+            if any(word not in self.FILLER_WORDS for word in first_words[i1:i2] + second_words[j1:j2]):
+                return False
+        return True
+
+    def cluster(self, reviews):
+        """Group reviews into duplicate clusters.
+
+        Returns a list of clusters, each a list of indices into ``reviews``.
+        The first index of each cluster is its representative.
+        """
+        # Stage 1: identical normalized text
+        groups = {}
+        normalized = []
+        for idx, review in enumerate(reviews):
+            text = self.normalize_text(review.get('text', ''))
+            normalized.append(text)
+            groups.setdefault(self.text_hash(text), []).append(idx)
+
+        exact_groups = list(groups.values())
+        if len(exact_groups) < 2:
+            return exact_groups
+
+        # Stage 2: MinHash/LSH over one representative per exact group.
+        # Only cluster representatives are indexed, and a group joins a cluster
+        # only if it is similar enough to that representative (no chaining).
+        shingle_sets = [self.shingles(normalized[group[0]]) for group in exact_groups]
+        buckets = {}
+        clusters = []
+
+        for group_idx, shingle_set in enumerate(shingle_sets):
+            threshold = self.similarity_threshold(normalized[exact_groups[group_idx][0]])
+            signature = self.minhash(shingle_set)
+            band_keys = [
+                (band, signature[band * self.rows:(band + 1) * self.rows])
+                for band in range(self.bands)
+            ]
+
+            candidates = {cluster_idx for key in band_keys for cluster_idx in buckets.get(key, ())}
+            best_cluster, best_score = None, 0.0
+            for cluster_idx in candidates:
+                representative = clusters[cluster_idx][0]
+                rep_threshold = self.similarity_threshold(normalized[exact_groups[representative][0]])
+                score = self.jaccard(shingle_set, shingle_sets[representative])
+                if score < max(threshold, rep_threshold) or score <= best_score:
+                    continue
+                if self.only_filler_differences(normalized[exact_groups[group_idx][0]],
+                                                normalized[exact_groups[representative][0]]):
+                    best_cluster, best_score = cluster_idx, score
+
+            if best_cluster is not None:
+                clusters[best_cluster].append(group_idx)
+                continue
+
+            clusters.append([group_idx])
+            for key in band_keys:
+                buckets.setdefault(key, []).append(len(clusters) - 1)
+
+        return [
+            sorted(idx for group_idx in cluster for idx in exact_groups[group_idx])
+            for cluster in clusters
+        ]
+
+    def deduplicate(self, reviews):
+        """Run the full dedup stage.
+
+        Returns ``(unique_reviews, clusters, stats)`` where ``clusters`` index
+        into ``unique_reviews``.
+        """
+        unique_reviews = self.remove_exact_duplicates(reviews)
+        clusters = self.cluster(unique_reviews)
+
+        inference_calls = len(clusters)
+        saved = len(reviews) - inference_calls
+        stats = {
+            'input_reviews': len(reviews),
+            'duplicates_removed': len(reviews) - len(unique_reviews),
+            'unique_reviews': len(unique_reviews),
+            'clusters': inference_calls,
+            'inference_calls': inference_calls,
+            'inference_saved': saved,
+            'inference_saved_percentage': round(saved / len(reviews) * 100, 1) if reviews else 0
+        }
+
+        return unique_reviews, clusters, stats
@@ -5,7 +5,8 @@ import sys
 import json
 import time
 import re
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlunparse, urljoin, parse_qsl, urlencode
+from urllib.request import Request, urlopen
 
 try:
     from selenium import webdriver
@@ -15,20 +16,55 @@ try:
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
     from webdriver_manager.chrome import ChromeDriverManager
-    from bs4 import BeautifulSoup
     from selenium.common.exceptions import TimeoutException, NoSuchElementException
-except ImportError as e:
-    print(f"Missing required packages. Run: pip install selenium beautifulsoup4 webdriver-manager", file=sys.stderr)
-    sys.exit(1)
+    SELENIUM_AVAILABLE = True
+except ImportError:
+    SELENIUM_AVAILABLE = False
+
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BS4_AVAILABLE = False
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+TRACKING_PARAMS = {'ref', 'ref_', 'tag', 'psc', 'th', 'smid', 'pd_rd_i', 'pd_rd_r', 'pd_rd_w', 'pd_rd_wg', 'pf_rd_p', 'pf_rd_r', 'qid', 'sr', 'keywords', 'crid', 'sprefix'}
+
+
+def normalize_product_url(url):
+    """Canonical form of a product URL, so the same product maps to one key"""
+    parsed = urlparse(url.strip())
+    scheme = (parsed.scheme or 'https').lower()
+    host = parsed.netloc.lower()
+
+    # Amazon: every product/reviews URL collapses to /dp/<ASIN>
+    asin = re.search(r'/(?:dp|gp/product|product-reviews)/([A-Z0-9]{10})', parsed.path, re.IGNORECASE)
+    if 'amazon' in host and asin:
+        return f"{scheme}://{host}/dp/{asin.group(1).upper()}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith('utm_')
+    )
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((scheme, host, path, '', urlencode(query), ''))
 
 
 class ProductReviewScraper:
-    def __init__(self):
+    def __init__(self, use_browser=True, site=None):
         self.driver = None
-        self.setup_driver()
+        self.use_browser = use_browser
+        self.site = site
+        if use_browser:
+            self.setup_driver()
 
     def setup_driver(self):
         """Initialize Chrome WebDriver with proper configuration"""
+        if not SELENIUM_AVAILABLE:
+            raise Exception("Selenium not available. Install with: pip install selenium webdriver-manager")
+
         try:
             chrome_options = Options()
             chrome_options.add_argument("--headless")
@@ -40,8 +76,7 @@ class ProductReviewScraper:
             chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
             chrome_options.add_experimental_option('useAutomationExtension', False)
             
-            user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            chrome_options.add_argument(f"user-agent={user_agent}")
+            chrome_options.add_argument(f"user-agent={USER_AGENT}")
 
             service = Service(ChromeDriverManager().install())
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
@@ -88,7 +123,44 @@ class ProductReviewScraper:
             
             # If no reviews on main page, try reviews page
             if len(reviews) < 3:
-                reviews.extend(self.scrape_amazon_reviews_page(url))
+                reviews = self.merge_reviews(reviews, self.scrape_amazon_reviews_page(url))
+
+            return {
+                'success': True,
+                'product': product_data,
+                'reviews': reviews
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f"Amazon scraping failed: {str(e)}",
+                'product': {},
+                'reviews': []
+            }
+
+    def fetch_html(self, url, timeout=20):
+        """Fetch a page without a browser"""
+        request = Request(url, headers={'User-Agent': USER_AGENT, 'Accept-Language': 'en-IN,en;q=0.9'})
+        with urlopen(request, timeout=timeout) as response:
+            charset = response.headers.get_content_charset() or 'utf-8'
+            return response.read().decode(charset, errors='replace')
+
+    def scrape_amazon_static(self, url):
+        """Scrape Amazon product and reviews from static HTML (no browser)"""
+        try:
+            soup = BeautifulSoup(self.fetch_html(url), 'html.parser')
+            product_data = self.extract_amazon_product_info(soup)
+            reviews = self.extract_amazon_reviews(soup)
+
+            # If no reviews on main page, try reviews page
+            reviews_link = soup.select_one('a[data-hook="see-all-reviews-link-foot"]')
+            if len(reviews) < 3 and reviews_link:
+                try:
+                    reviews_soup = BeautifulSoup(self.fetch_html(urljoin(url, reviews_link['href'])), 'html.parser')
+                    reviews = self.merge_reviews(reviews, self.extract_amazon_reviews(reviews_soup))
+                except Exception as e:
+                    print(f"Could not scrape reviews page: {e}", file=sys.stderr)
 
             return {
                 'success': True,
@@ -268,6 +340,23 @@ class ProductReviewScraper:
 
         return review
 
+    def merge_reviews(self, reviews, extra_reviews):
+        """Append reviews from another page, skipping ones already collected"""
+        merged = []
+        seen = set()
+
+        for review in reviews + extra_reviews:
+            author = review['author'].strip().lower()
+            # Without a real author two identical texts may be different reviews
+            if author and author != 'anonymous':
+                key = (author, review['date'].strip().lower(), re.sub(r'\s+', ' ', review['text']).strip().lower())
+                if key in seen:
+                    continue
+                seen.add(key)
+            merged.append({**review, 'id': f'review_{len(merged)}'})
+
+        return merged
+
     def scrape_amazon_reviews_page(self, product_url):
         """Navigate to Amazon reviews page and scrape more reviews"""
         reviews = []
@@ -325,10 +414,10 @@ class ProductReviewScraper:
     def scrape(self, url):
         """Main scraping method"""
         try:
-            domain = urlparse(url).netloc.lower()
+            domain = self.site or urlparse(url).netloc.lower()
             
             if 'amazon' in domain:
-                result = self.scrape_amazon(url)
+                result = self.scrape_amazon(url) if self.use_browser else self.scrape_amazon_static(url)
             else:
                 result = self.scrape_generic(url)
                 
@@ -351,6 +440,10 @@ def main():
         print(json.dumps({'success': False, 'error': 'URL argument required'}))
         return
 
+    if not SELENIUM_AVAILABLE or not BS4_AVAILABLE:
+        print(f"Missing required packages. Run: pip install selenium beautifulsoup4 webdriver-manager", file=sys.stderr)
+        sys.exit(1)
+
     url = sys.argv[1]
     
     try:
@@ -5,7 +5,15 @@ import sys
 import json
 import warnings
 import re
+import gc
+import time
+import argparse
 from collections import Counter
+from itertools import islice
+
+from review_dedup import ReviewDeduplicator
+from attribute_matcher import AttributeMatcher
+from bounded_analysis import iter_json_reviews, MemoryMonitor, ReservoirSample, HashedKeywordAccumulator
 
 warnings.filterwarnings('ignore')
 
@@ -25,6 +33,7 @@ except ImportError:
 try:
     import nltk
     from nltk.corpus import stopwords
+    from nltk.tokenize import sent_tokenize
     NLTK_AVAILABLE = True
     
     # Download required NLTK data
@@ -39,11 +48,15 @@ except ImportError:
 
 
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, aspect_mode=False, lexicon_path=None, batch_size=None):
         self.sentiment_pipeline = None
+        self.aspect_mode = aspect_mode
+        # Overrides the per-pass default inference batch sizes when set
+        self.batch_size = batch_size
+        self.deduplicator = ReviewDeduplicator()
         self.setup_sentiment_model()
         self.setup_stopwords()
-        self.setup_product_attributes()
+        self.setup_product_attributes(lexicon_path)
 
     def setup_sentiment_model(self):
         """Initialize Hugging Face sentiment analysis model"""
@@ -78,10 +91,10 @@ class SentimentAnalyzer:
         else:
             self.stop_words = self.get_basic_stopwords()
 
-    def setup_product_attributes(self):
-        """Define product attributes for analysis"""
+    def setup_product_attributes(self, lexicon_path=None):
+        """Define product attributes and compile the attribute matcher"""
         self.product_attributes = {
-            'quality': ['quality', 'build', 'construction', 'material', 'durable', 'sturdy', 'solid', 'cheap', 'flimsy', 'poor'],
+            'quality': ['quality', 'build', 'construction', 'material', 'durable', 'sturdy', 'solid', 'cheap quality', 'cheaply made', 'cheap material', 'flimsy', 'poor'],
             'price': ['price', 'cost', 'expensive', 'cheap', 'value', 'money', 'affordable', 'overpriced', 'budget', 'costly'],
             'delivery': ['delivery', 'shipping', 'package', 'arrived', 'fast', 'slow', 'damaged', 'packaging', 'courier'],
             'performance': ['performance', 'speed', 'fast', 'slow', 'efficient', 'lag', 'smooth', 'responsive', 'quick'],
@@ -92,6 +105,12 @@ class SentimentAnalyzer:
             'size': ['size', 'big', 'small', 'compact', 'large', 'fit', 'portable', 'heavy', 'light'],
             'service': ['service', 'support', 'help', 'response', 'staff', 'rude', 'helpful', 'customer', 'care']
         }
+        
+        if lexicon_path:
+            self.attribute_matcher = AttributeMatcher.from_file(lexicon_path, base_lexicon=self.product_attributes)
+            self.product_attributes = self.attribute_matcher.lexicon
+        else:
+            self.attribute_matcher = AttributeMatcher(self.product_attributes)
 
     def get_basic_stopwords(self):
         """Basic English stop words"""
@@ -103,20 +122,23 @@ class SentimentAnalyzer:
             'his', 'her', 'its', 'our', 'their'
         }
 
-    def analyze_sentiment_huggingface(self, texts):
+    def analyze_sentiment_huggingface(self, texts, batch_size=None):
         """Analyze sentiment using Hugging Face transformers"""
         if not self.sentiment_pipeline:
             return self.analyze_sentiment_rules(texts)
+        batch_size = batch_size or self.batch_size or 8
 
-        results = []
-        batch_size = 8  # Process in small batches
+        results = [None] * len(texts)
+        
+        # Batch texts of similar length together to minimise padding
+        order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
         
         try:
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                batch_results = self.sentiment_pipeline(batch)
+            for i in range(0, len(order), batch_size):
+                batch_indices = order[i:i + batch_size]
+                batch_results = self.sentiment_pipeline([texts[idx] for idx in batch_indices])
                 
-                for result in batch_results:
+                for idx, result in zip(batch_indices, batch_results):
                     # Convert Hugging Face output to our format
                     label = result['label'].lower()
                     score = result['score']
@@ -129,10 +151,10 @@ class SentimentAnalyzer:
                     else:
                         sentiment_label = 'neutral'
                     
-                    results.append({
+                    results[idx] = {
                         'label': sentiment_label,
                         'score': round(score, 3)
-                    })
+                    }
                     
             return results
             
@@ -221,16 +243,11 @@ class SentimentAnalyzer:
 
     def detect_attributes(self, text):
         """Detect product attributes mentioned in text"""
-        text_lower = text.lower()
-        detected = set()
-        
-        for attribute, keywords in self.product_attributes.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    detected.add(attribute)
-                    break
-        
-        return list(detected)
+        return self.attribute_matcher.detect(text)
+
+    def match_attributes(self, text):
+        """Attribute mentions in text as (start, end, term, attributes) tuples"""
+        return self.attribute_matcher.match(text)
 
     def calculate_attribute_scores(self, analyzed_reviews):
         """Calculate scores for each product attribute"""
@@ -245,7 +262,10 @@ class SentimentAnalyzer:
                     attribute_stats[attr] = {'positive': 0, 'negative': 0, 'neutral': 0}
                 attribute_stats[attr][sentiment] += 1
         
-        # Convert to score format
+        return self.format_attribute_scores(attribute_stats)
+
+    def format_attribute_scores(self, attribute_stats):
+        """Convert per-attribute sentiment counts to score format"""
         attributes_analysis = []
         for attr, stats in attribute_stats.items():
             total = sum(stats.values())
@@ -264,6 +284,106 @@ class SentimentAnalyzer:
         attributes_analysis.sort(key=lambda x: x['score'], reverse=True)
         return attributes_analysis
 
+    def split_aspect_segments(self, text):
+        """Split review text into sentences, then into contrasting clauses"""
+        sentences = []
+        if NLTK_AVAILABLE:
+            try:
+                sentences = sent_tokenize(text)
+            except Exception:
+                sentences = []
+        if not sentences:
+            sentences = re.split(r'(?<=[.!?])\s+|\n+', text)
+        
+        segments = []
+        for sentence in sentences:
+            # "Great camera, terrible battery" -> two segments with their own sentiment
+            clauses = re.split(r'\s*[,;]\s*|\s+(?:but|however|although|though|whereas|while)\s+', sentence, flags=re.IGNORECASE)
+            segments.extend(clause.strip(' .!?') for clause in clauses if clause and len(clause.strip(' .!?')) > 2)
+        
+        return segments
+
+    def calculate_aspect_scores(self, analyzed_reviews, batch_size=None):
+        """Calculate attribute scores from the sentences that mention each attribute"""
+        batch_size = batch_size or self.batch_size or 32
+        # Collect attribute-bearing segments from all reviews
+        segment_attributes = {}
+        review_segments = 0
+        for review in analyzed_reviews:
+            for segment in self.split_aspect_segments(review.get('text', '')):
+                attributes = self.detect_attributes(segment)
+                if not attributes:
+                    continue
+                review_segments += 1
+                key = segment.lower()
+                if key not in segment_attributes:
+                    segment_attributes[key] = {'text': segment, 'attributes': attributes, 'mentions': 0}
+                segment_attributes[key]['mentions'] += 1
+        
+        segments = list(segment_attributes.values())
+        
+        # One length-bucketed batch stream for every segment of every review
+        start = time.perf_counter()
+        segment_results = self.analyze_sentiment_huggingface([seg['text'] for seg in segments], batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        
+        attribute_stats = {}
+        for segment, sentiment in zip(segments, segment_results):
+            label = sentiment['label']
+            for attr in segment['attributes']:
+                if attr not in attribute_stats:
+                    attribute_stats[attr] = {
+                        'counts': {'positive': 0, 'negative': 0, 'neutral': 0},
+                        'phrases': {'positive': Counter(), 'negative': Counter()}
+                    }
+                stats = attribute_stats[attr]
+                stats['counts'][label] += segment['mentions']
+                if label in stats['phrases']:
+                    stats['phrases'][label][segment['text']] += segment['mentions']
+        
+        attributes_analysis = []
+        for attr, stats in attribute_stats.items():
+            counts = stats['counts']
+            total = sum(counts.values())
+            score = (counts['positive'] * 100 + counts['neutral'] * 50) / total
+            attributes_analysis.append({
+                'key': attr,
+                'displayName': attr.replace('_', ' ').title(),
+                'score': round(score, 1),
+                'positive_count': counts['positive'],
+                'negative_count': counts['negative'],
+                'neutral_count': counts['neutral'],
+                'top_positive_phrases': [phrase for phrase, _ in stats['phrases']['positive'].most_common(5)],
+                'top_negative_phrases': [phrase for phrase, _ in stats['phrases']['negative'].most_common(5)]
+            })
+        
+        attributes_analysis.sort(key=lambda x: x['score'], reverse=True)
+        
+        aspect_stats = {
+            'segments': review_segments,
+            'inference_segments': len(segments),
+            'batches': -(-len(segments) // batch_size),
+            'seconds': round(elapsed, 4),
+            'segments_per_second': round(len(segments) / elapsed, 1) if elapsed > 0 else 0
+        }
+        
+        return attributes_analysis, aspect_stats
+
+    def count_keyword_mentions(self, keywords, texts):
+        """Number of texts mentioning each keyword as a whole word or phrase"""
+        counts = Counter({keyword: 0 for keyword in keywords})
+        if not keywords:
+            return counts
+        
+        matcher = AttributeMatcher({keyword: [keyword] for keyword in keywords}, inflect=False)
+        for text in texts:
+            mentioned = set()
+            for _, _, _, matched_keywords in matcher.match(text, longest_only=False):
+                mentioned.update(matched_keywords)
+            counts.update(mentioned)
+        
+        return counts
+
     def generate_keyword_insights(self, analyzed_reviews):
         """Generate keyword insights from analyzed reviews"""
         positive_texts = [r['text'] for r in analyzed_reviews if r.get('sentiment_label') == 'positive' and r.get('text')]
@@ -273,9 +393,10 @@ class SentimentAnalyzer:
         negative_keywords = self.extract_keywords_tfidf(negative_texts) if negative_texts else []
         
         # Add counts and weights
+        pos_counts = self.count_keyword_mentions(positive_keywords[:10], positive_texts)
         pos_keywords_with_stats = []
         for keyword in positive_keywords[:10]:
-            count = sum(1 for text in positive_texts if keyword.lower() in text.lower())
+            count = pos_counts[keyword]
             weight = count / len(positive_texts) if positive_texts else 0
             pos_keywords_with_stats.append({
                 'term': keyword,
@@ -283,9 +404,10 @@ class SentimentAnalyzer:
                 'weight': round(weight, 3)
             })
         
+        neg_counts = self.count_keyword_mentions(negative_keywords[:10], negative_texts)
         neg_keywords_with_stats = []
         for keyword in negative_keywords[:10]:
-            count = sum(1 for text in negative_texts if keyword.lower() in text.lower())
+            count = neg_counts[keyword]
             weight = count / len(negative_texts) if negative_texts else 0
             neg_keywords_with_stats.append({
                 'term': keyword,
@@ -305,24 +427,34 @@ class SentimentAnalyzer:
         
         print(f"Analyzing {len(reviews)} reviews...", file=sys.stderr)
         
-        # Extract texts and perform sentiment analysis
-        review_texts = [review.get('text', '') for review in reviews if review.get('text')]
+        # Only reviews with text can be analyzed
+        reviews = [review for review in reviews if review.get('text')]
         
-        if not review_texts:
+        if not reviews:
             return self.get_empty_analysis()
         
-        # Perform sentiment analysis
-        sentiment_results = self.analyze_sentiment_huggingface(review_texts)
+        # Drop repeated reviews and group near-duplicates so inference runs once per cluster
+        reviews, clusters, dedup_stats = self.deduplicator.deduplicate(reviews)
+        print(f"Dedup: {dedup_stats['inference_calls']} inference calls for {dedup_stats['input_reviews']} reviews", file=sys.stderr)
+        
+        # Perform sentiment analysis on cluster representatives
+        representative_texts = [reviews[cluster[0]]['text'] for cluster in clusters]
+        cluster_results = self.analyze_sentiment_huggingface(representative_texts)
+        
+        # Fan cluster labels back out to every member review
+        sentiment_results = [None] * len(reviews)
+        cluster_sizes = [1] * len(reviews)
+        for cluster, sentiment in zip(clusters, cluster_results):
+            for idx in cluster:
+                sentiment_results[idx] = sentiment
+                cluster_sizes[idx] = len(cluster)
         
         # Process each review
         analyzed_reviews = []
         sentiments = []
         
         for i, review in enumerate(reviews):
-            if i < len(sentiment_results):
-                sentiment = sentiment_results[i]
-            else:
-                sentiment = {'label': 'neutral', 'score': 0.5}
+            sentiment = sentiment_results[i] or {'label': 'neutral', 'score': 0.5}
             
             # Extract keywords and attributes for this review
             review_text = review.get('text', '')
@@ -334,51 +466,171 @@ class SentimentAnalyzer:
                 'sentiment_label': sentiment['label'],
                 'sentiment_score': sentiment['score'],
                 'extracted_keywords': keywords,
-                'detected_attributes': attributes
+                'detected_attributes': attributes,
+                'duplicate_count': cluster_sizes[i]
             }
             
             analyzed_reviews.append(analyzed_review)
             sentiments.append(sentiment['label'])
         
         # Calculate sentiment summary
-        total_reviews = len(sentiments)
-        sentiment_summary = {
-            'positive': {
-                'count': sentiments.count('positive'),
-                'percentage': round(sentiments.count('positive') / total_reviews * 100, 1) if total_reviews > 0 else 0
-            },
-            'negative': {
-                'count': sentiments.count('negative'),
-                'percentage': round(sentiments.count('negative') / total_reviews * 100, 1) if total_reviews > 0 else 0
-            },
-            'neutral': {
-                'count': sentiments.count('neutral'),
-                'percentage': round(sentiments.count('neutral') / total_reviews * 100, 1) if total_reviews > 0 else 0
-            }
-        }
+        sentiment_summary = self.build_sentiment_summary(Counter(sentiments))
         
         # Generate insights
         keyword_insights = self.generate_keyword_insights(analyzed_reviews)
-        attributes = self.calculate_attribute_scores(analyzed_reviews)
+        aspect_stats = None
+        if self.aspect_mode:
+            attributes, aspect_stats = self.calculate_aspect_scores(analyzed_reviews)
+        else:
+            attributes = self.calculate_attribute_scores(analyzed_reviews)
         
         # Generate top issues
-        negative_keywords = keyword_insights['negative_keywords']
+        issues = self.build_issues(keyword_insights['negative_keywords'])
+        
+        result = {
+            'analyzed_reviews': analyzed_reviews,
+            'sentiment_summary': sentiment_summary,
+            'keyword_insights': keyword_insights,
+            'attributes': attributes,
+            'issues_overview': {
+                'most_mentioned': issues
+            },
+            'dedup_stats': dedup_stats
+        }
+        if aspect_stats:
+            result['aspect_stats'] = aspect_stats
+        
+        return result
+
+    def build_sentiment_summary(self, sentiment_counts):
+        """Sentiment counts and percentages"""
+        total_reviews = sum(sentiment_counts.values())
+        return {
+            label: {
+                'count': sentiment_counts.get(label, 0),
+                'percentage': round(sentiment_counts.get(label, 0) / total_reviews * 100, 1) if total_reviews > 0 else 0
+            }
+            for label in ['positive', 'negative', 'neutral']
+        }
+
+    def build_issues(self, negative_keywords):
+        """Most mentioned issues from negative keyword stats"""
         issues = []
-        for i, keyword_data in enumerate(negative_keywords[:5]):
+        for keyword_data in negative_keywords[:5]:
             issues.append({
                 'issue': keyword_data['term'],
                 'mentions': keyword_data['count'],
                 'percent_of_negatives': round(keyword_data['weight'] * 100, 1)
             })
+        return issues
+
+    def analyze_reviews_bounded(self, reviews, chunk_size=1000, memory_budget_mb=None, sample_size=20):
+        """Analyze an arbitrarily large stream of reviews with bounded memory.
+
+        Reviews are processed in chunks and only aggregates are kept: sentiment
+        and attribute counts, hashed keyword statistics and a reservoir sample
+        of representative reviews per sentiment.
+        
+        ``memory_budget_mb`` is a soft peak-RSS target: while RSS is over it
+        and still growing, the chunk size is halved. Aspect mode needs every
+        attribute segment at once and is not supported here.
+        """
+        if self.aspect_mode:
+            raise ValueError("Aspect mode is not supported in bounded mode")
+        
+        # Baseline is taken here, after the model has loaded
+        monitor = MemoryMonitor(memory_budget_mb)
+        if monitor.stats()['budget_below_baseline']:
+            print(f"Memory budget {memory_budget_mb} MB is below the {monitor.baseline_mb:.0f} MB already in use", file=sys.stderr)
+        sentiment_counts = Counter()
+        attribute_stats = {}
+        dedup_totals = Counter()
+        keyword_accumulators = {
+            'positive': HashedKeywordAccumulator(self.stop_words),
+            'negative': HashedKeywordAccumulator(self.stop_words)
+        }
+        samples = {label: ReservoirSample(sample_size, seed=label) for label in ['positive', 'negative', 'neutral']}
+        chunks = 0
+        
+        review_iter = iter(reviews)
+        while True:
+            chunk = list(islice(review_iter, chunk_size))
+            if not chunk:
+                break
+            chunks += 1
+            
+            chunk = [review for review in chunk if review.get('text')]
+            if not chunk:
+                continue
+            
+            # Dedup within the chunk; inference once per cluster
+            chunk, clusters, dedup_stats = self.deduplicator.deduplicate(chunk)
+            dedup_totals.update(dedup_stats)
+            cluster_results = self.analyze_sentiment_huggingface([chunk[cluster[0]]['text'] for cluster in clusters])
+            
+            for cluster, sentiment in zip(clusters, cluster_results):
+                for idx in cluster:
+                    review = chunk[idx]
+                    label = sentiment['label']
+                    sentiment_counts[label] += 1
+                    
+                    attributes = self.detect_attributes(review['text'])
+                    for attr in attributes:
+                        if attr not in attribute_stats:
+                            attribute_stats[attr] = {'positive': 0, 'negative': 0, 'neutral': 0}
+                        attribute_stats[attr][label] += 1
+                    
+                    if label in keyword_accumulators:
+                        keyword_accumulators[label].add_document(review['text'])
+                    
+                    samples[label].add({
+                        **review,
+                        'text': review['text'][:500],
+                        'sentiment_label': label,
+                        'sentiment_score': sentiment['score'],
+                        'detected_attributes': attributes,
+                        'duplicate_count': len(cluster)
+                    })
+            
+            del chunk, clusters, cluster_results
+            if monitor.sample():
+                gc.collect()
+                chunk_size = max(50, chunk_size // 2)
+                print(f"Over memory budget and growing, reducing chunk size to {chunk_size}", file=sys.stderr)
+        
+        if not sentiment_counts:
+            return self.get_empty_analysis()
+        
+        keyword_insights = {}
+        for label, accumulator in keyword_accumulators.items():
+            keywords_with_stats = []
+            for keyword in accumulator.top_keywords()[:10]:
+                count = accumulator.document_count(keyword)
+                keywords_with_stats.append({
+                    'term': keyword,
+                    'count': count,
+                    'weight': round(count / accumulator.documents, 3) if accumulator.documents else 0
+                })
+            keyword_insights[f'{label}_keywords'] = keywords_with_stats
+        
+        input_reviews = dedup_totals['input_reviews']
+        dedup_stats = {key: dedup_totals[key] for key in ['input_reviews', 'duplicates_removed', 'unique_reviews', 'clusters', 'inference_calls', 'inference_saved']}
+        dedup_stats['inference_saved_percentage'] = round(dedup_totals['inference_saved'] / input_reviews * 100, 1) if input_reviews else 0
+        
+        monitor.sample()
+        memory_stats = monitor.stats()
+        memory_stats.update({'chunks': chunks, 'final_chunk_size': chunk_size, 'sample_size': sample_size})
         
         return {
-            'analyzed_reviews': analyzed_reviews,
-            'sentiment_summary': sentiment_summary,
+            'analyzed_reviews': [review for sample in samples.values() for review in sample.items],
+            'sentiment_summary': self.build_sentiment_summary(sentiment_counts),
             'keyword_insights': keyword_insights,
-            'attributes': attributes,
+            'attributes': self.format_attribute_scores(attribute_stats),
             'issues_overview': {
-                'most_mentioned': issues
-            }
+                'most_mentioned': self.build_issues(keyword_insights['negative_keywords'])
+            },
+            'dedup_stats': dedup_stats,
+            'memory_stats': memory_stats
         }
 
     def get_empty_analysis(self):
@@ -395,7 +647,16 @@ class SentimentAnalyzer:
                 'negative_keywords': []
             },
             'attributes': [],
-            'issues_overview': {'most_mentioned': []}
+            'issues_overview': {'most_mentioned': []},
+            'dedup_stats': {
+                'input_reviews': 0,
+                'duplicates_removed': 0,
+                'unique_reviews': 0,
+                'clusters': 0,
+                'inference_calls': 0,
+                'inference_saved': 0,
+                'inference_saved_percentage': 0
+            }
         }
 
 
@@ -404,10 +665,36 @@ def main():
         print(json.dumps({'error': 'Reviews data required'}))
         return
 
+    parser = argparse.ArgumentParser(description='Analyze review sentiment')
+    parser.add_argument('reviews', nargs='?', help='JSON array of scraped reviews')
+    parser.add_argument('--input', help="JSON Lines file of reviews ('-' for stdin) instead of the reviews argument")
+    parser.add_argument('--aspects', action='store_true', help='Score attributes per sentence instead of per review')
+    parser.add_argument('--lexicon', help='JSON file of extra {attribute: [terms]} to match')
+    parser.add_argument('--bounded', action='store_true', help='Process reviews in chunks with bounded memory')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Reviews per chunk in bounded mode')
+    parser.add_argument('--memory-budget-mb', type=float, help='Soft peak RSS target in bounded mode')
+    parser.add_argument('--sample-size', type=int, default=20, help='Representative reviews kept per sentiment in bounded mode')
+    args = parser.parse_args()
+
+    if args.bounded and args.aspects:
+        parser.error('--aspects is not supported with --bounded')
+
     try:
-        reviews_data = json.loads(sys.argv[1])
-        analyzer = SentimentAnalyzer()
-        result = analyzer.analyze_reviews(reviews_data)
+        if args.input:
+            reviews_data = iter_json_reviews(args.input)
+        else:
+            reviews_data = json.loads(args.reviews or '[]')
+        
+        analyzer = SentimentAnalyzer(aspect_mode=args.aspects, lexicon_path=args.lexicon)
+        if args.bounded:
+            result = analyzer.analyze_reviews_bounded(
+                reviews_data,
+                chunk_size=args.chunk_size,
+                memory_budget_mb=args.memory_budget_mb,
+                sample_size=args.sample_size
+            )
+        else:
+            result = analyzer.analyze_reviews(list(reviews_data))
         print(json.dumps(result, ensure_ascii=False))
         
     except json.JSONDecodeError as e:
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Append-only time-series store for product price/rating/sentiment snapshots.
+
+Each product gets one file of fixed-width little-endian records sorted by
+timestamp. A record is only written when a value changed since the previous
+snapshot, so scheduled refreshes of unchanged products cost nothing and the
+series is read back as a step function. Reads memory-map the file and
+binary-search the timestamp column.
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import hashlib
+import argparse
+import threading
+
+from scraper import normalize_product_url
+
+
+# timestamp, price, rating, review_count, positive, neutral, negative
+RECORD = struct.Struct('<qdfqiii')
+FIELDS = ['timestamp', 'price', 'rating', 'review_count', 'positive', 'neutral', 'negative']
+
+
+def snapshot_from_analysis(product, analysis, timestamp=None):
+    """Build a snapshot from scraped product info and a sentiment analysis result"""
+    summary = (analysis or {}).get('sentiment_summary', {})
+    return {
+        'timestamp': int(timestamp if timestamp is not None else time.time()),
+        'price': float(product.get('price') or 0),
+        'rating': float(product.get('overall_rating') or 0),
+        'review_count': int(product.get('total_reviews_count') or 0),
+        'positive': summary.get('positive', {}).get('count', 0),
+        'neutral': summary.get('neutral', {}).get('count', 0),
+        'negative': summary.get('negative', {}).get('count', 0)
+    }
+
+
+class SnapshotStore:
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.last_records = {}
+        self.lock = threading.Lock()
+        os.makedirs(root_dir, exist_ok=True)
+
+    def product_path(self, product_key):
+        digest = hashlib.sha1(product_key.encode('utf-8')).hexdigest()
+        return os.path.join(self.root_dir, digest[:2], f'{digest}.snap')
+
+    def pack(self, snapshot):
+        """Snapshot dict -> record tuple, rounding through the on-disk types"""
+        return RECORD.unpack(RECORD.pack(*(snapshot.get(field) or 0 for field in FIELDS)))
+
+    def complete_size(self, path):
+        """Size of the whole records in a file, ignoring a partial trailing record"""
+        if not os.path.exists(path):
+            return 0
+        size = os.path.getsize(path)
+        return size - size % RECORD.size
+
+    def last_record(self, product_key):
+        """Most recent record for a product (cached after first read)"""
+        if product_key in self.last_records:
+            return self.last_records[product_key]
+
+        record = None
+        path = self.product_path(product_key)
+        size = self.complete_size(path)
+        if size >= RECORD.size:
+            with open(path, 'rb') as f:
+                f.seek(size - RECORD.size)
+                record = RECORD.unpack(f.read(RECORD.size))
+
+        self.last_records[product_key] = record
+        return record
+
+    def append_many(self, product_key, snapshots, force=False):
+        """Append snapshots (oldest first) for one product; returns records written"""
+        with self.lock:
+            last = self.last_record(product_key)
+            buffer = bytearray()
+            written = 0
+
+            for snapshot in snapshots:
+                record = self.pack(snapshot)
+                if last is not None:
+                    if record[0] < last[0]:
+                        raise ValueError(f"Snapshot at {record[0]} is older than the last stored snapshot ({last[0]})")
+                    # Only write deltas: unchanged values extend the previous record
+                    if not force and record[1:] == last[1:]:
+                        continue
+                buffer += RECORD.pack(*record)
+                last = record
+                written += 1
+
+            if buffer:
+                path = self.product_path(product_key)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'ab') as f:
+                    # An interrupted write can leave a partial record; drop it so
+                    # new records stay aligned
+                    partial = f.tell() % RECORD.size
+                    if partial:
+                        print(f"Dropping partial snapshot record at end of {path}", file=sys.stderr)
+                        f.truncate(f.tell() - partial)
+                    f.write(buffer)
+                self.last_records[product_key] = last
+
+            return written
+
+    def append(self, product_key, snapshot, force=False):
+        """Append one snapshot; returns False if nothing changed since the last one"""
+        return self.append_many(product_key, [snapshot], force=force) > 0
+
+    def open_records(self, product_key):
+        """Read-only memory map of a product's records, or None"""
+        path = self.product_path(product_key)
+        if not os.path.exists(path) or os.path.getsize(path) < RECORD.size:
+            return None
+        with open(path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def bisect(self, mm, count, timestamp):
+        """Index of the first record with timestamp > ``timestamp``"""
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if struct.unpack_from('<q', mm, mid * RECORD.size)[0] <= timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def read_range(self, product_key, start=None, end=None):
+        """Records with start <= timestamp <= end.
+
+        Because unchanged snapshots are not stored, the record in effect at
+        ``start`` is included with its timestamp clamped to ``start``.
+        """
+        mm = self.open_records(product_key)
+        if mm is None:
+            return []
+
+        try:
+            count = len(mm) // RECORD.size
+            first = 0 if start is None else max(0, self.bisect(mm, count, start) - 1)
+            last = count if end is None else self.bisect(mm, count, end)
+
+            rows = []
+            for idx in range(first, last):
+                record = dict(zip(FIELDS, RECORD.unpack_from(mm, idx * RECORD.size)))
+                record['rating'] = round(record['rating'], 2)
+                if start is not None and record['timestamp'] < start:
+                    record['timestamp'] = start
+                rows.append(record)
+            return rows
+        finally:
+            mm.close()
+
+    def downsample(self, product_key, start, end, step):
+        """One point per ``step`` seconds between start and end for charting.
+
+        Each point carries the values in effect at the end of its bucket plus
+        the min/max price in effect during it.
+        """
+        rows = self.read_range(product_key, start, end)
+        points = []
+        idx = 0
+        current = None
+
+        for bucket_start in range(start, end + 1, step):
+            bucket_end = min(bucket_start + step - 1, end)
+            # The previous value is still in effect at bucket_start unless a
+            # record lands exactly there
+            price_min = price_max = None
+            if current is not None and not (idx < len(rows) and rows[idx]['timestamp'] == bucket_start):
+                price_min = price_max = current['price']
+
+            while idx < len(rows) and rows[idx]['timestamp'] <= bucket_end:
+                current = rows[idx]
+                price_min = current['price'] if price_min is None else min(price_min, current['price'])
+                price_max = current['price'] if price_max is None else max(price_max, current['price'])
+                idx += 1
+
+            if current is None:
+                continue
+            points.append({
+                **current,
+                'timestamp': bucket_start,
+                'price_min': price_min,
+                'price_max': price_max
+            })
+
+        return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the product snapshot store')
+    parser.add_argument('--dir', required=True, help='Snapshot store directory')
+    parser.add_argument('--url', required=True, help='Product URL')
+    parser.add_argument('--start', type=int, help='Start timestamp (epoch seconds)')
+    parser.add_argument('--end', type=int, help='End timestamp (epoch seconds)')
+    parser.add_argument('--step', type=int, help='Downsample to one point per STEP seconds')
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.dir)
+    key = normalize_product_url(args.url)
+    if args.step:
+        end = args.end if args.end is not None else int(time.time())
+        start = args.start if args.start is not None else end - 30 * 24 * 3600
+        result = store.downsample(key, start, end, args.step)
+    else:
+        result = store.read_range(key, args.start, args.end)
+
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The analysis scripts are run directly from python-script/, not installed as a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,78 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from analysis_service import AnalysisService, ServiceBusy
+
+
+class StubService(AnalysisService):
+    """Service whose jobs wait on an event instead of scraping"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release = threading.Event()
+        self.job_urls = []
+
+    def run_job(self, url, enqueued_at):
+        self.job_urls.append(url)
+        self.release.wait(5)
+        return {'success': True, 'url': url}
+
+
+def wait_until_idle(service, timeout=5):
+    """Wait for finish_job: result() waiters wake before done callbacks run"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with service.lock:
+            if not service.inflight:
+                return
+        time.sleep(0.001)
+    raise AssertionError('jobs still in flight')
+
+
+def test_concurrent_requests_for_same_product_share_one_job():
+    service = StubService(max_workers=2)
+    urls = [f'https://www.amazon.in/item-{i}/dp/B0ABCDEFGH?ref=sr_{i}' for i in range(10)]
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        futures = [pool.submit(service.analyze, url, 5) for url in urls]
+        service.release.set()
+        results = [future.result() for future in futures]
+
+    assert service.job_urls == ['https://www.amazon.in/dp/B0ABCDEFGH']
+    assert {result['served_from'] for result in results} <= {'job', 'coalesced', 'cache'}
+    assert service.metrics()['counters']['jobs'] == 1
+    service.shutdown()
+
+
+def test_finished_job_is_cached_before_leaving_inflight():
+    service = StubService(max_workers=1)
+    states = []
+
+    class ObservedInflight(dict):
+        def pop(self, key, default=None):
+            # Called inside finish_job: the result must already be cached
+            states.append(key in service.cache)
+            return super().pop(key, default)
+
+    service.inflight = ObservedInflight()
+    service.release.set()
+    service.analyze('https://example.com/product/1', timeout=5)
+    wait_until_idle(service)
+
+    assert states == [True]
+    assert service.analyze('https://example.com/product/1')['served_from'] == 'cache'
+    service.shutdown()
+
+
+def test_full_queue_is_rejected():
+    service = StubService(max_workers=1, max_queue=0)
+    service.submit('https://example.com/product/1')
+
+    with pytest.raises(ServiceBusy):
+        service.submit('https://example.com/product/2')
+
+    service.release.set()
+    service.shutdown()
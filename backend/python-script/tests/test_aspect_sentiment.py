@@ -0,0 +1,60 @@
+import pytest
+
+from sentiment_analyzer import SentimentAnalyzer
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    analyzer = SentimentAnalyzer(aspect_mode=True)
+    # Exercise the rule-based fallback even where transformers is installed
+    analyzer.sentiment_pipeline = None
+    return analyzer
+
+
+def by_key(attributes):
+    return {attribute['key']: attribute for attribute in attributes}
+
+
+def test_contrasting_clauses_split_into_segments(analyzer):
+    assert analyzer.split_aspect_segments('Great camera, terrible battery') == ['Great camera', 'terrible battery']
+    assert analyzer.split_aspect_segments('Great camera but terrible battery. Fast delivery!') == [
+        'Great camera', 'terrible battery', 'Fast delivery'
+    ]
+
+
+def test_each_attribute_scored_from_its_own_segment(analyzer):
+    attributes, _ = analyzer.calculate_aspect_scores([{'text': 'Great camera, terrible battery'}])
+    scores = by_key(attributes)
+
+    assert scores['camera']['positive_count'] == 1
+    assert scores['camera']['score'] == 100.0
+    assert scores['battery']['negative_count'] == 1
+    assert scores['battery']['score'] == 0.0
+
+
+def test_phrases_counted_by_mentions_across_reviews(analyzer):
+    reviews = [
+        {'text': 'Great camera, terrible battery'},
+        {'text': 'great camera but terrible battery!'},
+        {'text': 'Awful battery drain'}
+    ]
+
+    attributes, _ = analyzer.calculate_aspect_scores(reviews)
+    scores = by_key(attributes)
+
+    assert scores['camera']['positive_count'] == 2
+    assert scores['camera']['top_positive_phrases'] == ['Great camera']
+    assert scores['battery']['negative_count'] == 3
+    assert scores['battery']['top_negative_phrases'] == ['terrible battery', 'Awful battery drain']
+    assert scores['battery']['top_positive_phrases'] == []
+
+
+def test_repeated_segments_run_inference_once(analyzer):
+    reviews = [{'text': 'Great camera, terrible battery'} for _ in range(5)]
+
+    attributes, aspect_stats = analyzer.calculate_aspect_scores(reviews, batch_size=4)
+
+    assert aspect_stats['segments'] == 10
+    assert aspect_stats['inference_segments'] == 2
+    assert aspect_stats['batches'] == 1
+    assert by_key(attributes)['battery']['negative_count'] == 5
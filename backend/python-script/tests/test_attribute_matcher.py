@@ -0,0 +1,74 @@
+import json
+
+from attribute_matcher import AttributeMatcher
+from sentiment_analyzer import SentimentAnalyzer
+
+
+LEXICON = {
+    'battery': ['battery', 'last', 'battery life'],
+    'size': ['fit', 'compact'],
+    'quality': ['cheap quality', 'cheaply made'],
+    'price': ['cheap', 'price']
+}
+
+
+def test_words_inside_other_words_do_not_match():
+    matcher = AttributeMatcher(LEXICON)
+
+    assert matcher.detect('Made of plastic, a real benefit') == []
+
+
+def test_inflected_variants_match():
+    matcher = AttributeMatcher(LEXICON)
+
+    assert matcher.detect('It lasts all day') == ['battery']
+    assert matcher.detect('Fitting in my pocket is easy') == ['size']
+
+
+def test_possessives_match_base_word():
+    matcher = AttributeMatcher(LEXICON)
+
+    assert matcher.detect("The battery's charge is great") == ['battery']
+    assert [term for _, _, term, _ in matcher.match("camera's fit")] == ['fit']
+
+
+def test_longest_phrase_wins():
+    matcher = AttributeMatcher(LEXICON)
+
+    matches = matcher.match('cheap quality but cheap price')
+
+    assert [(term, categories) for _, _, term, categories in matches] == [
+        ('cheap quality', ['quality']),
+        ('cheap', ['price']),
+        ('price', ['price'])
+    ]
+
+
+def test_match_positions():
+    text = 'Great battery life overall'
+    matches = AttributeMatcher(LEXICON).match(text)
+
+    assert [(text[start:end], term) for start, end, term, _ in matches] == [('battery life', 'battery life')]
+
+
+def test_overlapping_matches():
+    matches = AttributeMatcher(LEXICON).match('battery life', longest_only=False)
+
+    assert [term for _, _, term, _ in matches] == ['battery', 'battery life']
+
+
+def test_lexicon_file_extends_base(tmp_path):
+    path = tmp_path / 'lexicon.json'
+    path.write_text(json.dumps({'Sound': ['speaker', 'audio quality'], 'battery': ['standby time']}))
+
+    matcher = AttributeMatcher.from_file(str(path), base_lexicon=LEXICON)
+
+    assert matcher.detect('Speakers are loud, standby time is great') == ['battery', 'sound']
+
+
+def test_keyword_mentions_use_keyword_tokens():
+    analyzer = SentimentAnalyzer()
+
+    counts = analyzer.count_keyword_mentions(['camera', 'don', 'good'], ["camera's bad", "don't buy", 'goodness'])
+
+    assert counts == {'camera': 1, 'don': 1, 'good': 0}
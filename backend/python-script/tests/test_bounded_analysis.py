@@ -0,0 +1,75 @@
+import pytest
+
+from bounded_analysis import MemoryMonitor, ReservoirSample, HashedKeywordAccumulator
+from sentiment_analyzer import SentimentAnalyzer
+
+
+REVIEWS = [
+    {'author': f'U{i}', 'text': text}
+    for i, text in enumerate([
+        'Great camera and excellent battery life',
+        'Terrible charger, broken after a week',
+        'Good product',
+        'Awful screen, really disappointing display',
+        'The design is beautiful and the price is good',
+        'Okay phone for the money'
+    ] * 5)
+]
+
+
+class FakeMonitor(MemoryMonitor):
+    def __init__(self, readings, budget_mb):
+        self.readings = iter(readings)
+        super().__init__(budget_mb)
+
+    def current_rss_mb(self):
+        return next(self.readings)
+
+
+def test_monitor_only_signals_while_growing_over_budget():
+    monitor = FakeMonitor([100, 150, 300, 300, 300.5, 320], budget_mb=200)
+
+    assert [monitor.sample() for _ in range(5)] == [False, True, False, False, True]
+    stats = monitor.stats()
+    assert stats['baseline_rss_mb'] == 100
+    assert stats['growth_mb'] == 220
+    assert stats['budget_exceeded'] is True
+
+
+def test_monitor_flags_budget_below_baseline():
+    monitor = FakeMonitor([500], budget_mb=200)
+
+    assert monitor.stats()['budget_below_baseline'] is True
+
+
+def test_reservoir_is_bounded():
+    sample = ReservoirSample(5, seed=1)
+    for item in range(1000):
+        sample.add(item)
+
+    assert len(sample.items) == 5
+    assert sample.seen == 1000
+
+
+def test_hashed_keywords_count_documents():
+    accumulator = HashedKeywordAccumulator({'the', 'is'}, n_features=2 ** 12)
+    for text in ['battery drains fast', 'battery drains overnight', 'screen cracked']:
+        accumulator.add_document(text)
+
+    assert accumulator.document_count('battery drains') == 2
+    assert 'battery drains' in accumulator.top_keywords()
+
+
+def test_bounded_matches_exact_sentiment_counts():
+    analyzer = SentimentAnalyzer()
+
+    exact = analyzer.analyze_reviews(REVIEWS)
+    bounded = analyzer.analyze_reviews_bounded(iter(REVIEWS), chunk_size=50, sample_size=3)
+
+    assert bounded['sentiment_summary'] == exact['sentiment_summary']
+    assert len(bounded['analyzed_reviews']) <= 9
+
+
+def test_bounded_rejects_aspect_mode():
+    with pytest.raises(ValueError):
+        SentimentAnalyzer(aspect_mode=True).analyze_reviews_bounded(iter(REVIEWS))
@@ -0,0 +1,108 @@
+from review_dedup import ReviewDeduplicator
+
+
+LONG_REVIEW = (
+    'I have been using this phone for about three weeks now and overall the battery life is really {} '
+    'while the camera takes sharp photos outdoors and the screen stays readable in direct sunlight'
+)
+
+
+def review(text, author='User', date=''):
+    return {'author': author, 'date': date, 'text': text}
+
+
+def test_scraped_twice_review_is_dropped():
+    reviews = [review('Great phone, fast delivery', 'Asha'), review('Great phone, fast delivery!', 'asha')]
+
+    unique_reviews, clusters, stats = ReviewDeduplicator().deduplicate(reviews)
+
+    assert len(unique_reviews) == 1
+    assert stats['duplicates_removed'] == 1
+
+
+def test_anonymous_reviews_are_clustered_not_dropped():
+    reviews = [review('Good product', 'Anonymous'), review('Good product', 'Anonymous'), review('Good product', '')]
+
+    unique_reviews, clusters, stats = ReviewDeduplicator().deduplicate(reviews)
+
+    assert len(unique_reviews) == 3
+    assert clusters == [[0, 1, 2]]
+    assert stats['duplicates_removed'] == 0
+    assert stats['inference_calls'] == 1
+
+
+def test_same_author_different_dates_are_kept():
+    reviews = [review('Nice', 'Ravi', '1 Jan 2026'), review('Nice', 'Ravi', '3 Mar 2026')]
+
+    unique_reviews, _, _ = ReviewDeduplicator().deduplicate(reviews)
+
+    assert len(unique_reviews) == 2
+
+
+def test_punctuation_and_case_variants_cluster():
+    text = 'The battery life is excellent and it easily lasts two full days, camera is great'
+    reviews = [review(text, 'A'), review(text.upper() + '!!', 'B'), review('Overall ' + text.lower(), 'C')]
+
+    assert ReviewDeduplicator().cluster(reviews) == [[0, 1, 2]]
+
+
+def test_opposite_long_reviews_do_not_merge():
+    reviews = [review(LONG_REVIEW.format('good'), 'A'), review(LONG_REVIEW.format('bad'), 'B')]
+
+    assert ReviewDeduplicator().cluster(reviews) == [[0], [1]]
+
+
+FORTY_WORDS = (
+    'I bought this phone recently and after a few weeks I can say the {} and the screen '
+    'is bright enough outside while the speaker is loud and the build feels solid so overall the '
+    'battery is {}'
+)
+
+
+def test_changed_last_word_does_not_merge():
+    reviews = [review(FORTY_WORDS.format('camera is sharp', 'good'), 'A'),
+               review(FORTY_WORDS.format('camera is sharp', 'bad'), 'B')]
+
+    assert len(FORTY_WORDS.format('camera is sharp', 'good').split()) == 40
+    assert ReviewDeduplicator().cluster(reviews) == [[0], [1]]
+
+
+def test_changed_middle_word_does_not_merge():
+    reviews = [review(FORTY_WORDS.format('camera is excellent', 'fine'), 'A'),
+               review(FORTY_WORDS.format('camera is terrible', 'fine'), 'B')]
+
+    assert ReviewDeduplicator().cluster(reviews) == [[0], [1]]
+
+
+def test_added_not_does_not_merge():
+    reviews = [review(FORTY_WORDS.format('camera is sharp', 'good'), 'A'),
+               review(FORTY_WORDS.format('camera is sharp', 'not good'), 'B')]
+
+    assert ReviewDeduplicator().cluster(reviews) == [[0], [1]]
+
+
+def test_clusters_do_not_chain_through_intermediate_reviews():
+    # Each review is close to its neighbour but the ends share almost nothing
+    words = [f'word{i}' for i in range(40)]
+    reviews = [review(' '.join(words[shift:shift + 20]), f'U{shift}') for shift in range(0, 21, 2)]
+
+    deduplicator = ReviewDeduplicator(long_threshold=0.8)
+    clusters = deduplicator.cluster(reviews)
+
+    for cluster in clusters:
+        representative = deduplicator.shingles(deduplicator.normalize_text(reviews[cluster[0]]['text']))
+        for idx in cluster[1:]:
+            member = deduplicator.shingles(deduplicator.normalize_text(reviews[idx]['text']))
+            assert deduplicator.jaccard(representative, member) >= 0.8
+    assert len(clusters) > 1
+
+
+def test_stats_report_inference_saved():
+    reviews = [review('Good product', f'U{i}') for i in range(4)] + [review('Terrible charger, stopped working', 'X')]
+
+    _, clusters, stats = ReviewDeduplicator().deduplicate(reviews)
+
+    assert len(clusters) == 2
+    assert stats['inference_calls'] == 2
+    assert stats['inference_saved'] == 3
+    assert stats['inference_saved_percentage'] == 60.0
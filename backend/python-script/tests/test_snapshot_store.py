@@ -0,0 +1,65 @@
+import os
+
+from snapshot_store import RECORD, SnapshotStore
+
+
+def snapshot(timestamp, price, rating=4.0):
+    return {'timestamp': timestamp, 'price': price, 'rating': rating, 'review_count': 10,
+            'positive': 5, 'neutral': 3, 'negative': 2}
+
+
+def test_unchanged_snapshots_are_not_written(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+
+    assert store.append('p', snapshot(100, 100.0))
+    assert not store.append('p', snapshot(200, 100.0))
+    assert store.append('p', snapshot(300, 90.0))
+    assert [row['timestamp'] for row in store.read_range('p')] == [100, 300]
+
+
+def test_read_range_clamps_record_in_effect_at_start(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.append_many('p', [snapshot(100, 100.0), snapshot(300, 90.0)])
+
+    rows = store.read_range('p', 200, 400)
+
+    assert [(row['timestamp'], row['price']) for row in rows] == [(200, 100.0), (300, 90.0)]
+
+
+def test_downsample_bucket_starting_on_a_record_ignores_previous_price(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.append_many('p', [snapshot(100, 100.0), snapshot(300, 90.0)])
+
+    points = store.downsample('p', 100, 499, 100)
+
+    assert [(p['timestamp'], p['price_min'], p['price_max']) for p in points] == [
+        (100, 100.0, 100.0),
+        (200, 100.0, 100.0),
+        (300, 90.0, 90.0),
+        (400, 90.0, 90.0)
+    ]
+
+
+def test_downsample_bucket_covers_price_in_effect_before_a_change(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.append_many('p', [snapshot(100, 100.0), snapshot(350, 90.0)])
+
+    points = store.downsample('p', 100, 399, 100)
+
+    assert (points[-1]['price_min'], points[-1]['price_max'], points[-1]['price']) == (90.0, 100.0, 90.0)
+
+
+def test_partial_trailing_record_is_dropped_before_appending(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.append('p', snapshot(100, 100.0))
+    path = store.product_path('p')
+    with open(path, 'ab') as f:
+        f.write(b'\x01\x02\x03\x04\x05')
+
+    # A fresh store (e.g. after a restart) must not read the partial record
+    reopened = SnapshotStore(str(tmp_path))
+    assert not reopened.append('p', snapshot(200, 100.0))
+    assert reopened.append('p', snapshot(300, 90.0))
+
+    assert os.path.getsize(path) % RECORD.size == 0
+    assert [(row['timestamp'], row['price']) for row in reopened.read_range('p')] == [(100, 100.0), (300, 90.0)]